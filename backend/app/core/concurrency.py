@@ -0,0 +1,126 @@
+# Admission control for the analysis endpoints and the CPU thread budget shared with torch/BLAS
+import os
+import threading
+from contextlib import contextmanager
+
+from fastapi import HTTPException
+
+CPU_COUNT = os.cpu_count() or 1
+
+# The deep model's micro-batching scheduler (app.services.inference_scheduler). Its settings live
+# here because they decide how deep requests share the cores.
+DEEP_SCHEDULER_ENABLED = os.getenv("DEEP_SCHEDULER_ENABLED", "true").lower() == "true"
+DEEP_SCHEDULER_MAX_BATCH = int(os.getenv("DEEP_SCHEDULER_MAX_BATCH", "32"))
+
+# Requests allowed to run analysis at the same time, per model type. With the scheduler, admitted
+# deep requests mostly wait for their share of a batch, so enough of them are let in to fill one;
+# without it, each admitted request runs its own forward pass.
+_DEFAULT_DEEP_CONCURRENCY = DEEP_SCHEDULER_MAX_BATCH if DEEP_SCHEDULER_ENABLED else max(1, CPU_COUNT // 2)
+MAX_CONCURRENT = {
+    "rule": int(os.getenv("MAX_CONCURRENT_RULE", str(max(4, CPU_COUNT * 2)))),
+    "deep": int(os.getenv("MAX_CONCURRENT_DEEP", str(_DEFAULT_DEEP_CONCURRENCY))),
+}
+# How long a request may wait for a slot before it is turned away (0 = reject immediately)
+ADMISSION_TIMEOUT_MS = float(os.getenv("ADMISSION_TIMEOUT_MS", "0"))
+RETRY_AFTER_SECONDS = int(os.getenv("RETRY_AFTER_SECONDS", "1"))
+
+# Intra-op threads per forward pass. The scheduler runs one forward pass at a time, which gets every
+# core; otherwise concurrent deep requests times this should not exceed the cores.
+_DEFAULT_TORCH_THREADS = CPU_COUNT if DEEP_SCHEDULER_ENABLED else max(1, CPU_COUNT // MAX_CONCURRENT["deep"])
+TORCH_NUM_THREADS = int(os.getenv("TORCH_NUM_THREADS", str(_DEFAULT_TORCH_THREADS)))
+# Worker threads for sync endpoints: one per admitted analysis plus headroom for everything else
+REQUEST_THREADS = int(os.getenv("REQUEST_THREADS", str(sum(MAX_CONCURRENT.values()) + 8)))
+
+# OpenMP/BLAS read these when torch or numpy is first imported, so they are set at import time.
+# Values already present in the environment win.
+for _var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+    os.environ.setdefault(_var, str(TORCH_NUM_THREADS))
+
+
+def apply_torch_thread_budget():
+    """
+    Pin torch's intra-op pool to the budget. Called right before the deep model is built.
+    """
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(TORCH_NUM_THREADS)
+    try:
+        # Concurrency comes from request threads, not from torch's inter-op pool
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Can only be set once, before any parallel work has started
+
+
+async def configure_request_threads():
+    """
+    Size anyio's worker-thread pool, which runs every sync endpoint.
+    """
+    import anyio.to_thread
+
+    anyio.to_thread.current_default_thread_limiter().total_tokens = REQUEST_THREADS
+
+
+class AdmissionController:
+    """
+    Per-model concurrency limits. When a model's slots are all taken, new requests get a
+    fast 503 with Retry-After instead of queueing behind the work already in progress.
+    """
+
+    def __init__(self, limits: dict, timeout_ms: float = 0.0, retry_after: int = 1):
+        self.limits = dict(limits)
+        self.timeout = timeout_ms / 1000.0
+        self.retry_after = retry_after
+        self._slots = {model: threading.BoundedSemaphore(limit) for model, limit in self.limits.items()}
+        self._lock = threading.Lock()
+        self._in_flight = {model: 0 for model in self.limits}
+        self._admitted = {model: 0 for model in self.limits}
+        self._rejected = {model: 0 for model in self.limits}
+
+    def try_acquire(self, model: str):
+        """
+        Take a slot for `model` or raise a 503 HTTPException. Pair with release().
+        """
+        slots = self._slots[model]
+        acquired = slots.acquire(timeout=self.timeout) if self.timeout > 0 else slots.acquire(blocking=False)
+        with self._lock:
+            if not acquired:
+                self._rejected[model] += 1
+            else:
+                self._in_flight[model] += 1
+                self._admitted[model] += 1
+        if not acquired:
+            raise HTTPException(
+                status_code=503,
+                detail=f"The {model} model is at capacity, please retry shortly",
+                headers={"Retry-After": str(self.retry_after)}
+            )
+
+    def release(self, model: str):
+        with self._lock:
+            self._in_flight[model] -= 1
+        self._slots[model].release()
+
+    @contextmanager
+    def admit(self, model: str):
+        self.try_acquire(model)
+        try:
+            yield
+        finally:
+            self.release(model)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                model: {
+                    "limit": self.limits[model],
+                    "in_flight": self._in_flight[model],
+                    "admitted": self._admitted[model],
+                    "rejected": self._rejected[model]
+                }
+                for model in self.limits
+            }
+
+
+admission = AdmissionController(MAX_CONCURRENT, ADMISSION_TIMEOUT_MS, RETRY_AFTER_SECONDS)
@@ -0,0 +1,50 @@
+# Language data the rule-based pipeline needs at runtime, checked (never downloaded) at startup
+import os
+from typing import List
+
+import nltk
+
+# TextBlob only needs Punkt for sentence splitting. NLTK 3.8.2+ reads the pickle-free
+# punkt_tab tables; older releases read the punkt pickles.
+try:
+    from nltk.tokenize import PunktTokenizer  # noqa: F401
+    PUNKT_RESOURCE = "punkt_tab"
+except ImportError:
+    PUNKT_RESOURCE = "punkt"
+
+REQUIRED_NLTK_RESOURCES = (f"tokenizers/{PUNKT_RESOURCE}",)
+
+PROVISIONING_HINT = (
+    "Run 'python download_nltk.py' once to provision them, "
+    "or point NLTK_DATA at a directory that already has them."
+)
+
+
+def textblob_lexicon_path() -> str:
+    # The PatternAnalyzer lexicon ships inside the textblob package, not with the NLTK corpora
+    import textblob.en
+
+    return os.path.join(os.path.dirname(textblob.en.__file__), "en-sentiment.xml")
+
+
+def missing_corpora() -> List[str]:
+    missing = []
+    for resource in REQUIRED_NLTK_RESOURCES:
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            missing.append(resource)
+    if not os.path.isfile(textblob_lexicon_path()):
+        missing.append("textblob/en/en-sentiment.xml")
+    return missing
+
+
+def check_corpora():
+    """
+    Fail fast when the language data is not on disk, instead of downloading it on boot.
+    """
+    missing = missing_corpora()
+    if missing:
+        raise RuntimeError(
+            f"Missing language data: {', '.join(missing)} (searched {', '.join(nltk.data.path)}). {PROVISIONING_HINT}"
+        )
@@ -0,0 +1,183 @@
+# Latency metrics for the analysis pipeline: Prometheus exposition and Server-Timing headers
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, Optional, Tuple
+
+# Per-request stage totals in seconds. The dict is shared with the threadpool thread running a
+# sync endpoint (anyio copies the context, not the dict), so stages recorded there show up here.
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+STAGE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SENTENCE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000, 20000)
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, buckets: Iterable[float]):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}  # labels -> [bucket counts..., count, sum]
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(key, list(series)) for key, series in sorted(self._series.items())]
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key + (('le', repr(float(bound))),))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(key + (('le', '+Inf'),))} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {series[-2]}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {series[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(f"{self.name}{_format_labels(key)} {value}" for key, value in items)
+        return lines
+
+
+stage_duration = Histogram(
+    "analysis_stage_duration_seconds",
+    "Time spent in each stage of the analysis pipeline",
+    STAGE_BUCKETS
+)
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "End-to-end request latency by route",
+    STAGE_BUCKETS
+)
+sentences_per_request = Histogram(
+    "analysis_sentences_per_request",
+    "Number of sentences analyzed per request",
+    SENTENCE_BUCKETS
+)
+analysis_requests = Counter("analysis_requests_total", "Analysis requests by endpoint and model choice")
+
+
+def record_stage(stage: str, seconds: float):
+    stage_duration.observe(seconds, stage=stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def timed(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+
+def record_analysis(endpoint: str, model: str, sentences: int):
+    analysis_requests.inc(endpoint=endpoint, model=model)
+    sentences_per_request.observe(sentences, endpoint=endpoint)
+
+
+def mark_handler_done():
+    """
+    Called by an endpoint right before it returns, so the time FastAPI then spends
+    validating and encoding the response is reported as the `serialize` stage.
+    """
+    timings = _request_timings.get()
+    if timings is not None:
+        timings["_handler_done"] = time.perf_counter()
+
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    return ", ".join(
+        f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in timings.items() if not stage.startswith("_")
+    )
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware that collects the per-request stage breakdown and returns it in a
+    Server-Timing header, along with the total and serialization time.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings: Dict[str, float] = {}
+        token = _request_timings.set(timings)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                now = time.perf_counter()
+                handler_done = timings.get("_handler_done")
+                if handler_done is not None:
+                    record_stage("serialize", now - handler_done)
+                timings["total"] = now - started
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing_header(timings).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            request_duration.observe(time.perf_counter() - started, route=path)
+
+
+def render_metrics(extra_lines: Iterable[str] = ()) -> str:
+    lines = []
+    for metric in (stage_duration, request_duration, sentences_per_request, analysis_requests):
+        lines.extend(metric.render())
+    lines.extend(extra_lines)
+    return "\n".join(lines) + "\n"
+
+
+def gauge_lines(name: str, documentation: str, values: Dict[Tuple[Tuple[str, str], ...], float],
+                metric_type: str = "gauge"):
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {metric_type}"]
+    lines.extend(f"{name}{_format_labels(key)} {value}" for key, value in values.items())
+    return lines
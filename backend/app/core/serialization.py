@@ -0,0 +1,27 @@
+# JSON encoding for the analysis responses. orjson when installed, else the stdlib encoder
+# with the same settings as Starlette's JSONResponse.
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Encodes plain dicts/lists directly. Returned from endpoints that declare a response_model,
+    it skips FastAPI's response validation; the OpenAPI schema still comes from the decorator.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
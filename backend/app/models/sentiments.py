@@ -0,0 +1,58 @@
+# models.py
+
+from pydantic import BaseModel
+from typing import List, Literal, Optional, Dict
+
+class SentimentRequest(BaseModel):
+    paragraph: str
+
+class SentenceSentiment(BaseModel):
+    sentence: str
+    sentiment: str
+    score: float
+    confidence: Optional[float] = None
+    distribution: Optional[Dict[str, float]] = None
+    # Character span of the sentence in the submitted paragraph: paragraph[start:end]
+    start: Optional[int] = None
+    end: Optional[int] = None
+
+class ParagraphSentiment(BaseModel):
+    sentiment: str
+    average_score: float
+    confidence: Optional[float] = None
+    word_count: Optional[int] = None
+    char_count: Optional[int] = None
+    mental_state: Optional[str] = None
+    mental_state_distribution: Optional[Dict[str, float]] = None
+
+class SentimentResponse(BaseModel):
+    results: List[SentenceSentiment]
+    paragraph_sentiment: ParagraphSentiment
+
+class ColumnarDistributions(BaseModel):
+    # Per sentence: codes into the label table and the matching probabilities, rounded like scores
+    labels: List[List[int]]
+    scores: List[List[float]]
+
+class ColumnarSentimentResponse(BaseModel):
+    # Same content as SentimentResponse, one array per field; entry i of each array is sentence i
+    format: Literal["columnar"] = "columnar"
+    labels: List[str]
+    sentences: List[str]
+    starts: List[Optional[int]]
+    ends: List[Optional[int]]
+    sentiments: List[int]
+    scores: List[float]
+    confidences: List[float]
+    distributions: Optional[ColumnarDistributions] = None
+    paragraph_sentiment: ParagraphSentiment
+
+class BatchSentimentRequest(BaseModel):
+    paragraphs: List[str]
+
+class BatchSentimentResponse(BaseModel):
+    results: List[SentimentResponse]
+
+class DocumentSentimentResponse(BaseModel):
+    paragraph_sentiment: ParagraphSentiment
+    sentence_count: int
@@ -0,0 +1,473 @@
+# Paragraph analysis pipeline shared by the /analyze endpoints
+import heapq
+import logging
+import os
+from collections import Counter
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional, Union
+
+from app.models.sentiments import (
+    ColumnarSentimentResponse,
+    DocumentSentimentResponse,
+    SentimentResponse,
+    SentenceSentiment,
+    ParagraphSentiment
+)
+from app.utils.utils import SentenceStream, split_into_sentences
+from app.services.sentiment_rule import (
+    RULE_MODEL_VERSION,
+    classify_sentiment,
+    clean_text,
+    ensemble_prepared,
+    ensemble_prepared_batch,
+    prepare_sentence
+)
+from app.services.language import PARAGRAPH_SAMPLE_CHARS, paragraph_is_english
+from app.services.ml_model import DEEP_MODEL_VERSION, analyze_sentiment_bert_batch
+from app.services.inference_scheduler import get_scheduler
+from app.services.sentence_cache import get_sentence_cache, normalize_sentence
+from app.services.rule_pool import get_rule_pool
+from app.core.metrics import timed
+
+logger = logging.getLogger(__name__)
+
+
+# Sentences scored together per step when streaming results
+STREAM_CHUNK_SENTENCES = int(os.getenv("STREAM_CHUNK_SENTENCES", "4"))
+
+# json     - one SentenceSentiment object per sentence (default)
+# columnar - parallel arrays per field, labels as codes into a label table
+RESPONSE_FORMATS = ("json", "columnar")
+
+
+def deep_learning_enabled() -> bool:
+    return os.getenv("ENABLE_DEEP_LEARNING", "false").lower() == "true"
+
+
+class SentenceScore:
+    """
+    Unrounded result for one sentence. `emotion` is the label counted towards the
+    paragraph summary, or None when the sentence should not be counted.
+    `paragraph_dependent` results relied on the document's language and are not cached.
+    """
+    __slots__ = ("sentence", "sentiment", "score", "confidence", "distribution", "emotion", "paragraph_dependent")
+
+    def __init__(self, sentence: str, sentiment: str, score: float = 0.0, confidence: float = 0.0,
+                 distribution: Optional[Dict[str, float]] = None, emotion: Optional[str] = None,
+                 paragraph_dependent: bool = False):
+        self.sentence = sentence
+        self.sentiment = sentiment
+        self.score = score
+        self.confidence = confidence
+        self.distribution = distribution
+        self.emotion = emotion
+        self.paragraph_dependent = paragraph_dependent
+
+    def to_cache(self) -> dict:
+        return {
+            "sentiment": self.sentiment,
+            "score": self.score,
+            "confidence": self.confidence,
+            "distribution": self.distribution,
+            "emotion": self.emotion
+        }
+
+    @classmethod
+    def from_cache(cls, sentence: str, value: dict) -> "SentenceScore":
+        return cls(sentence, value["sentiment"], value["score"], value["confidence"],
+                   value["distribution"], value["emotion"])
+
+    def to_dict(self, top_k: Optional[int] = None) -> dict:
+        """
+        The SentenceSentiment fields as a plain dict, ready for the JSON encoder.
+        """
+        return {
+            "sentence": self.sentence,
+            "sentiment": self.sentiment,
+            "score": round(self.score, 2),
+            "confidence": round(self.confidence, 2),
+            "distribution": top_k_distribution(self.distribution, top_k),
+            "start": getattr(self.sentence, "start", None),
+            "end": getattr(self.sentence, "end", None)
+        }
+
+    def to_model(self) -> SentenceSentiment:
+        return SentenceSentiment(**self.to_dict())
+
+
+def top_k_distribution(distribution: Optional[Dict[str, float]], top_k: Optional[int]) -> Optional[Dict[str, float]]:
+    """
+    The `top_k` most likely labels of a distribution, most likely first. None keeps all of them.
+    """
+    if distribution is None or top_k is None or top_k >= len(distribution):
+        return distribution
+    return dict(heapq.nlargest(top_k, distribution.items(), key=itemgetter(1)))
+
+
+def score_rule_sentence(sentence: str, paragraph_english=False) -> SentenceScore:
+    # One cleaning + language detection pass, shared by VADER and TextBlob
+    prepared = prepare_sentence(sentence, paragraph_english)
+    logger.debug("Original: %s | Cleaned: %s | is_english: %s", sentence, prepared.cleaned, prepared.english)
+    if not prepared.english:
+        return SentenceScore(sentence, "Neutral", paragraph_dependent=prepared.paragraph_dependent)
+    avg_score, confidence = ensemble_prepared(prepared)
+    sentiment = classify_sentiment(avg_score)
+    logger.debug("Score: %s, Confidence: %s, Classified: %s", avg_score, confidence, sentiment)
+    return SentenceScore(sentence, sentiment, avg_score, confidence, emotion=sentiment,
+                         paragraph_dependent=prepared.paragraph_dependent)
+
+
+def score_rule_sentences(sentences: List[str], english_hints: list) -> List[SentenceScore]:
+    """
+    Same results as score_rule_sentence for each sentence, with VADER run once over the batch.
+    """
+    prepared = [prepare_sentence(s, hint) for s, hint in zip(sentences, english_hints)]
+    english = [p for p in prepared if p.english]
+    ensembles = iter(ensemble_prepared_batch(english))
+    scores = []
+    for sentence, p in zip(sentences, prepared):
+        if not p.english:
+            logger.debug("Original: %s | Cleaned: %s | is_english: False", sentence, p.cleaned)
+            scores.append(SentenceScore(sentence, "Neutral", paragraph_dependent=p.paragraph_dependent))
+            continue
+        avg_score, confidence = next(ensembles)
+        sentiment = classify_sentiment(avg_score)
+        logger.debug("Original: %s | Cleaned: %s | Score: %s, Confidence: %s, Classified: %s",
+                     sentence, p.cleaned, avg_score, confidence, sentiment)
+        scores.append(SentenceScore(sentence, sentiment, avg_score, confidence, emotion=sentiment,
+                                    paragraph_dependent=p.paragraph_dependent))
+    return scores
+
+
+def score_deep_sentences(sentences: List[str]) -> List[SentenceScore]:
+    if not deep_learning_enabled():
+        return [SentenceScore(s, "Unavailable") for s in sentences]
+    # All sentences go through the model together in length-sorted padded batches,
+    # shared with concurrent requests when the micro-batching scheduler is enabled
+    scheduler = get_scheduler()
+    with timed("transformer"):
+        if scheduler is not None:
+            bert_results = scheduler.analyze(sentences)
+        else:
+            bert_results = analyze_sentiment_bert_batch(sentences)
+    scores = []
+    for sentence, bert_result in zip(sentences, bert_results):
+        if bert_result is None:
+            scores.append(SentenceScore(sentence, "Unavailable"))
+            continue
+        sentiment = bert_result["emotion"].capitalize()
+        scores.append(SentenceScore(
+            sentence,
+            sentiment,
+            bert_result["score"],
+            bert_result["score"],
+            bert_result.get("distribution"),
+            emotion=sentiment
+        ))
+    return scores
+
+
+def model_version(model: str) -> str:
+    return DEEP_MODEL_VERSION if model == "deep" else RULE_MODEL_VERSION
+
+
+class DocumentLanguageHint:
+    """
+    Whether the whole document reads as English, so the rule model can skip per-sentence
+    language detection for unambiguous sentences. Detection runs the first time a sentence
+    actually needs the verdict; documents whose sentences settle their own language never pay for it.
+    """
+    __slots__ = ("_sample", "_value")
+
+    def __init__(self, paragraph: str):
+        self._sample = paragraph[:PARAGRAPH_SAMPLE_CHARS]
+        self._value = None
+
+    def __bool__(self) -> bool:
+        if self._value is None:
+            self._value = paragraph_is_english(clean_text(self._sample))
+        return self._value
+
+
+def document_language_hint(paragraph: str, model: str):
+    """
+    The document language verdict for `paragraph`, evaluated lazily (see DocumentLanguageHint).
+    """
+    if model == "deep":
+        return False
+    return DocumentLanguageHint(paragraph)
+
+
+def _score_uncached(sentences: List[str], model: str, english_hints: list) -> List[SentenceScore]:
+    if model == "deep":
+        return score_deep_sentences(sentences)
+    # Large documents are sharded across worker processes when the rule pool is enabled
+    pool = get_rule_pool(len(sentences))
+    if pool is not None:
+        # Stages run in the workers are not visible here, so the pool is timed as a whole
+        with timed("rule_pool"):
+            results = pool.score(sentences, english_hints)
+        scores = []
+        for sentence, (value, paragraph_dependent) in zip(sentences, results):
+            score = SentenceScore.from_cache(sentence, value)
+            score.paragraph_dependent = paragraph_dependent
+            scores.append(score)
+        return scores
+    return score_rule_sentences(sentences, english_hints)
+
+
+def score_sentences(sentences: List[str], model: str,
+                    english_hints: Optional[list] = None) -> List[SentenceScore]:
+    """
+    Score a flat list of sentences with the chosen engine, preserving order.
+    `english_hints` carries the document language verdict for each sentence.
+    Repeated sentences are served from the sentence cache when it is enabled;
+    results that depended on the document's language are neither served from nor stored in it.
+    """
+    if english_hints is None:
+        english_hints = [False] * len(sentences)
+    cache = get_sentence_cache()
+    if cache is None or (model == "deep" and not deep_learning_enabled()):
+        return _score_uncached(sentences, model, english_hints)
+
+    version = model_version(model)
+    cached = cache.get_many(sentences, model, version)
+    # Sentences repeated within the batch are only scored once per document language hint, as
+    # a verdict taken from one document's language must not be copied into another document
+    missing: Dict[tuple, List[int]] = {}
+    for i, value in enumerate(cached):
+        if value is None:
+            missing.setdefault((normalize_sentence(sentences[i]), english_hints[i]), []).append(i)
+    fresh = _score_uncached(
+        [sentences[indexes[0]] for indexes in missing.values()],
+        model,
+        [english_hints[indexes[0]] for indexes in missing.values()]
+    )
+
+    scores: List[Optional[SentenceScore]] = [
+        SentenceScore.from_cache(sentence, value) if value is not None else None
+        for sentence, value in zip(sentences, cached)
+    ]
+    to_store = []
+    for indexes, score in zip(missing.values(), fresh):
+        for i in indexes:
+            scores[i] = score if i == indexes[0] else SentenceScore.from_cache(sentences[i], score.to_cache())
+        # Failed deep inferences are retried next time rather than cached, and a verdict taken
+        # from this document's language would be wrong for the same sentence elsewhere
+        if score.sentiment != "Unavailable" and not score.paragraph_dependent:
+            to_store.append(score)
+    cache.put_many([s.sentence for s in to_store], [s.to_cache() for s in to_store], model, version)
+    return scores
+
+
+class ParagraphAggregate:
+    """
+    Running totals for the paragraph-level summary of a single document.
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self.count = 0
+        self.total_score = 0.0
+        self.total_confidence = 0.0
+        self.emotions = Counter()
+
+    def add(self, score: SentenceScore):
+        self.count += 1
+        self.total_score += score.score
+        self.total_confidence += score.confidence
+        if score.emotion is not None:
+            self.emotions[score.emotion] += 1
+
+    def summary(self, word_count: int, char_count: int) -> dict:
+        """
+        The ParagraphSentiment fields as a plain dict.
+        """
+        avg_paragraph_score = round(self.total_score / self.count, 2) if self.count else 0.0
+        avg_paragraph_confidence = round(self.total_confidence / self.count, 2) if self.count else 0.0
+        if self.model == "deep" and self.emotions:
+            # Pick the most frequent emotion for the paragraph
+            paragraph_sentiment = self.emotions.most_common(1)[0][0]
+        else:
+            paragraph_sentiment = classify_sentiment(avg_paragraph_score)
+
+        # Mental state: most common emotion/sentiment
+        if self.emotions:
+            mental_state = self.emotions.most_common(1)[0][0]
+            total = sum(self.emotions.values())
+            mental_state_distribution = {k: v / total for k, v in self.emotions.items()}
+        else:
+            mental_state = None
+            mental_state_distribution = None
+
+        return {
+            "sentiment": paragraph_sentiment,
+            "average_score": avg_paragraph_score,
+            "confidence": avg_paragraph_confidence,
+            "word_count": word_count,
+            "char_count": char_count,
+            "mental_state": mental_state,
+            "mental_state_distribution": mental_state_distribution
+        }
+
+    def build(self, word_count: int, char_count: int) -> ParagraphSentiment:
+        return ParagraphSentiment(**self.summary(word_count, char_count))
+
+
+def build_response(paragraph: str, scores: List[SentenceScore], model: str, top_k: Optional[int] = None) -> dict:
+    """
+    A SentimentResponse as plain dicts and lists. The endpoints encode it directly, so
+    thousands of sentences do not each become a pydantic model only to be validated again.
+    """
+    aggregate = ParagraphAggregate(model)
+    for score in scores:
+        aggregate.add(score)
+    return {
+        "results": [score.to_dict(top_k) for score in scores],
+        "paragraph_sentiment": aggregate.summary(len(paragraph.split()), len(paragraph))
+    }
+
+
+def build_columnar_response(paragraph: str, scores: List[SentenceScore], model: str,
+                            top_k: Optional[int] = None) -> dict:
+    """
+    A ColumnarSentimentResponse: the same results as parallel arrays, with sentiment and
+    distribution labels sent once in `labels` and referenced by their index. Distribution
+    probabilities are rounded to two decimals like scores; full-precision floats barely compress.
+    """
+    aggregate = ParagraphAggregate(model)
+    labels: Dict[str, int] = {}
+    sentences, starts, ends, sentiments, values, confidences = [], [], [], [], [], []
+    distribution_labels, distribution_scores = [], []
+    for score in scores:
+        aggregate.add(score)
+        sentences.append(score.sentence)
+        starts.append(getattr(score.sentence, "start", None))
+        ends.append(getattr(score.sentence, "end", None))
+        sentiments.append(labels.setdefault(score.sentiment, len(labels)))
+        values.append(round(score.score, 2))
+        confidences.append(round(score.confidence, 2))
+        distribution = top_k_distribution(score.distribution, top_k) or {}
+        distribution_labels.append([labels.setdefault(label, len(labels)) for label in distribution])
+        distribution_scores.append([round(p, 2) for p in distribution.values()])
+    has_distributions = any(distribution_labels)
+    return {
+        "format": "columnar",
+        "labels": list(labels),
+        "sentences": sentences,
+        "starts": starts,
+        "ends": ends,
+        "sentiments": sentiments,
+        "scores": values,
+        "confidences": confidences,
+        "distributions": {
+            "labels": distribution_labels,
+            "scores": distribution_scores
+        } if has_distributions else None,
+        "paragraph_sentiment": aggregate.summary(len(paragraph.split()), len(paragraph))
+    }
+
+
+def unavailable_response(format: str = "json") -> Union[SentimentResponse, ColumnarSentimentResponse]:
+    paragraph_sentiment = ParagraphSentiment(
+        sentiment="Unavailable",
+        average_score=0.0,
+        confidence=0.0
+    )
+    if format == "columnar":
+        return ColumnarSentimentResponse(
+            labels=[], sentences=[], starts=[], ends=[], sentiments=[], scores=[], confidences=[],
+            paragraph_sentiment=paragraph_sentiment
+        )
+    return SentimentResponse(results=[], paragraph_sentiment=paragraph_sentiment)
+
+
+def analyze_paragraph(paragraph: str, model: str, format: str = "json", top_k: Optional[int] = None) -> dict:
+    sentences = split_into_sentences(paragraph)
+    hints = [document_language_hint(paragraph, model)] * len(sentences)
+    scores = score_sentences(sentences, model, hints)
+    if format == "columnar":
+        return build_columnar_response(paragraph, scores, model, top_k)
+    return build_response(paragraph, scores, model, top_k)
+
+
+def iter_sentence_scores(paragraph: str, model: str,
+                         chunk_size: int = STREAM_CHUNK_SENTENCES) -> Iterator[SentenceScore]:
+    """
+    Score a paragraph a few sentences at a time, yielding each result as soon as it is ready.
+    """
+    sentences = split_into_sentences(paragraph)
+    hint = document_language_hint(paragraph, model)
+    for start in range(0, len(sentences), chunk_size):
+        chunk = sentences[start:start + chunk_size]
+        yield from score_sentences(chunk, model, [hint] * len(chunk))
+
+
+def analyze_paragraphs(paragraphs: List[str], model: str) -> List[dict]:
+    """
+    Analyze many documents at once: every sentence of the batch is scored in a
+    single pass so the engines run in bulk, then results are regrouped per document.
+    """
+    per_document = [split_into_sentences(p) for p in paragraphs]
+    flat = [s for sentences in per_document for s in sentences]
+    hints = [
+        hint
+        for paragraph, sentences in zip(paragraphs, per_document)
+        for hint in [document_language_hint(paragraph, model)] * len(sentences)
+    ]
+    scores = score_sentences(flat, model, hints)
+
+    responses = []
+    offset = 0
+    for paragraph, sentences in zip(paragraphs, per_document):
+        responses.append(build_response(paragraph, scores[offset:offset + len(sentences)], model))
+        offset += len(sentences)
+    return responses
+
+
+class DocumentAnalyzer:
+    """
+    Large-document mode: text is fed in chunks, segmented incrementally and scored as
+    sentences complete. Only running aggregates are kept, so memory stays flat however
+    long the document is.
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self.aggregate = ParagraphAggregate(model)
+        self.segmenter = SentenceStream()
+        self.english_hint = None
+        self.word_count = 0
+        self.char_count = 0
+        self._ends_in_word = False
+
+    def _count(self, text: str):
+        if not text:
+            return
+        words = len(text.split())
+        # A word cut in half by the chunk boundary was already counted
+        if words and self._ends_in_word and not text[0].isspace():
+            words -= 1
+        self.word_count += words
+        self.char_count += len(text)
+        self._ends_in_word = not text[-1].isspace()
+
+    def _score(self, sentences: List[str]):
+        if not sentences:
+            return
+        for score in score_sentences(sentences, self.model, [self.english_hint] * len(sentences)):
+            self.aggregate.add(score)
+
+    def feed(self, text: str):
+        self._count(text)
+        if self.english_hint is None and text.strip():
+            # Decided from the first chunk, like the paragraph verdict of /analyze
+            self.english_hint = document_language_hint(text, self.model)
+        self._score(self.segmenter.feed(text))
+
+    def finish(self) -> DocumentSentimentResponse:
+        self._score(self.segmenter.finish())
+        return DocumentSentimentResponse(
+            paragraph_sentiment=self.aggregate.build(self.word_count, self.char_count),
+            sentence_count=self.aggregate.count
+        )
@@ -0,0 +1,145 @@
+# Selectable CPU inference backends for the emotion model (PyTorch, int8, ONNX Runtime)
+import os
+import sys
+import time
+from typing import List, Optional
+
+from app.core.concurrency import apply_torch_thread_budget
+
+DEEP_MODEL_NAME = "j-hartmann/emotion-english-distilroberta-base"
+
+# torch       - fp32 PyTorch (reference)
+# torch-int8  - PyTorch with dynamic int8 quantization of the Linear layers
+# onnx        - ONNX Runtime, exported from the PyTorch checkpoint on first use
+# onnx-int8   - ONNX Runtime with dynamically int8-quantized weights
+BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+
+DEEP_INFERENCE_BACKEND = os.getenv("DEEP_INFERENCE_BACKEND", "torch").lower()
+# Exported ONNX models are cached here so the export only happens once per machine
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join("model_weights", "onnx"))
+
+# Small built-in corpus for the comparison mode
+SAMPLE_SENTENCES = [
+    "I am so happy to see you again!",
+    "This is the worst day of my life.",
+    "I can't believe they cancelled the show.",
+    "The package arrived on Tuesday.",
+    "I'm scared of what the test results will say.",
+    "That smell is absolutely revolting.",
+    "Why would anyone do something so cruel?",
+    "Thank you so much for your help.",
+    "I miss my grandmother every single day.",
+    "Wow, I did not expect that at all!",
+    "The meeting has been moved to 3pm.",
+    "Stop touching my things, I'm furious.",
+]
+
+
+def _load_onnx_model(quantized: bool):
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+    except ImportError:
+        raise ImportError("ONNX backends need optimum and onnxruntime. Please install with 'pip install optimum[onnxruntime]'.")
+
+    export_dir = os.path.join(ONNX_MODEL_DIR, "fp32")
+    if not os.path.exists(os.path.join(export_dir, "model.onnx")):
+        print(f"[INFO] Exporting {DEEP_MODEL_NAME} to ONNX in {export_dir}")
+        model = ORTModelForSequenceClassification.from_pretrained(DEEP_MODEL_NAME, export=True)
+        model.save_pretrained(export_dir)
+    if not quantized:
+        return ORTModelForSequenceClassification.from_pretrained(export_dir)
+
+    from optimum.onnxruntime import ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    quantized_dir = os.path.join(ONNX_MODEL_DIR, "int8")
+    if not os.path.exists(os.path.join(quantized_dir, "model_quantized.onnx")):
+        print(f"[INFO] Quantizing ONNX model to int8 in {quantized_dir}")
+        quantizer = ORTQuantizer.from_pretrained(export_dir)
+        quantizer.quantize(
+            save_dir=quantized_dir,
+            quantization_config=AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        )
+    return ORTModelForSequenceClassification.from_pretrained(quantized_dir, file_name="model_quantized.onnx")
+
+
+def build_pipeline(backend: str = DEEP_INFERENCE_BACKEND):
+    """
+    Build a text-classification pipeline for the emotion model on the given backend.
+    Every backend returns scores for all labels (top_k=None), so the {"emotion", "score",
+    "distribution"} contract of ml_model is unchanged.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown DEEP_INFERENCE_BACKEND '{backend}'. Expected one of: {', '.join(BACKENDS)}")
+    try:
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+        from transformers.pipelines import pipeline
+    except ImportError:
+        raise ImportError("transformers library is not installed. Please install with 'pip install transformers torch'.")
+
+    apply_torch_thread_budget()
+
+    tokenizer = AutoTokenizer.from_pretrained(DEEP_MODEL_NAME)
+    if backend == "torch":
+        model = AutoModelForSequenceClassification.from_pretrained(DEEP_MODEL_NAME)
+    elif backend == "torch-int8":
+        import torch
+        model = AutoModelForSequenceClassification.from_pretrained(DEEP_MODEL_NAME)
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    else:
+        model = _load_onnx_model(quantized=backend == "onnx-int8")
+
+    return pipeline(
+        "text-classification",
+        model=model,
+        tokenizer=tokenizer,
+        top_k=None
+    )
+
+
+def compare_backends(candidate: str, reference: str = "torch", sentences: Optional[List[str]] = None,
+                     batch_size: int = 16, repeats: int = 3) -> dict:
+    """
+    Run the same sentences through two backends and report how often the top emotion
+    agrees, the largest per-label probability difference, and the speedup of the candidate.
+    """
+    from app.services.ml_model import run_pipeline_batches
+
+    sentences = sentences or SAMPLE_SENTENCES
+    report = {"reference": reference, "candidate": candidate, "sentences": len(sentences)}
+    outputs = {}
+    for name in (reference, candidate):
+        pipe = build_pipeline(name)
+        run_pipeline_batches(pipe, sentences[:batch_size], batch_size)  # warm-up
+        started = time.perf_counter()
+        for _ in range(repeats):
+            results = run_pipeline_batches(pipe, sentences, batch_size)
+        elapsed = (time.perf_counter() - started) / repeats
+        outputs[name] = results
+        report[f"{name}_seconds"] = elapsed
+        report[f"{name}_sentences_per_second"] = len(sentences) / elapsed if elapsed else 0.0
+
+    agree = 0
+    max_diff = 0.0
+    for ref, cand in zip(outputs[reference], outputs[candidate]):
+        if ref is None or cand is None:
+            continue
+        agree += ref["emotion"] == cand["emotion"]
+        for label, score in ref["distribution"].items():
+            max_diff = max(max_diff, abs(score - cand["distribution"].get(label, 0.0)))
+    report["agreement_rate"] = agree / len(sentences) if sentences else 0.0
+    report["max_probability_diff"] = max_diff
+    report["speedup"] = report[f"{reference}_seconds"] / report[f"{candidate}_seconds"] if report[f"{candidate}_seconds"] else 0.0
+    return report
+
+
+if __name__ == "__main__":
+    # Usage: python -m app.services.inference_backends <candidate> [sentences.txt]
+    import json
+
+    candidate = sys.argv[1] if len(sys.argv) > 1 else "onnx-int8"
+    sentences = None
+    if len(sys.argv) > 2:
+        with open(sys.argv[2], encoding="utf-8") as f:
+            sentences = [line.strip() for line in f if line.strip()]
+    print(json.dumps(compare_backends(candidate, sentences=sentences), indent=2))
@@ -0,0 +1,152 @@
+# Cross-request micro-batching in front of the deep learning emotion model
+import os
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+
+from app.core.concurrency import DEEP_SCHEDULER_ENABLED, DEEP_SCHEDULER_MAX_BATCH
+from app.services.ml_model import analyze_sentiment_bert_batch
+
+DEEP_SCHEDULER_MAX_WAIT_MS = float(os.getenv("DEEP_SCHEDULER_MAX_WAIT_MS", "5"))
+
+
+class InferenceScheduler:
+    """
+    Collects sentences submitted by concurrent requests into one queue and runs them
+    through the model together. A batch is flushed as soon as it reaches `max_batch_size`
+    sentences or its oldest sentence has waited `max_wait_ms`, whichever comes first.
+    """
+
+    def __init__(self, infer_batch: Callable[[List[str]], List[Optional[dict]]],
+                 max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.infer_batch = infer_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = deque()  # (text, future, enqueued_at)
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        # Stats
+        self._batches = 0
+        self._items = 0
+        self._batch_sizes = Counter()
+        self._flush_reasons = Counter()
+        self._total_wait = 0.0
+        self._max_wait_seen = 0.0
+        self._total_infer = 0.0
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="inference-scheduler", daemon=True)
+            self._thread.start()
+
+    def submit(self, texts: List[str]) -> List[Future]:
+        """
+        Queue sentences for inference. Returns one future per sentence, in input order.
+        """
+        futures = [Future() for _ in texts]
+        if not texts:
+            return futures
+        now = time.monotonic()
+        with self._cond:
+            self._ensure_worker()
+            for text, future in zip(texts, futures):
+                self._queue.append((text, future, now))
+            self._cond.notify()
+        return futures
+
+    def analyze(self, texts: List[str]) -> List[Optional[dict]]:
+        return [future.result() for future in self.submit(texts)]
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._queue:
+                if self._stopping:
+                    return None, None
+                self._cond.wait()
+            deadline = self._queue[0][2] + self.max_wait
+            while len(self._queue) < self.max_batch_size and not self._stopping:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            reason = "full" if len(self._queue) >= self.max_batch_size else "timeout"
+            size = min(len(self._queue), self.max_batch_size)
+            batch = [self._queue.popleft() for _ in range(size)]
+        return batch, reason
+
+    def _run(self):
+        while True:
+            batch, reason = self._next_batch()
+            if batch is None:
+                return
+            started = time.monotonic()
+            texts = [text for text, _, _ in batch]
+            try:
+                results = self.infer_batch(texts)
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                results = None
+            finished = time.monotonic()
+            if results is not None:
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+
+            with self._cond:
+                self._batches += 1
+                self._items += len(batch)
+                self._batch_sizes[len(batch)] += 1
+                self._flush_reasons[reason] += 1
+                self._total_infer += finished - started
+                for _, _, enqueued_at in batch:
+                    waited = started - enqueued_at
+                    self._total_wait += waited
+                    self._max_wait_seen = max(self._max_wait_seen, waited)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "queue_depth": len(self._queue),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "batches": self._batches,
+                "sentences": self._items,
+                "avg_batch_size": self._items / self._batches if self._batches else 0.0,
+                "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+                "flush_reasons": dict(self._flush_reasons),
+                "avg_queue_wait_ms": self._total_wait / self._items * 1000.0 if self._items else 0.0,
+                "max_queue_wait_ms": self._max_wait_seen * 1000.0,
+                "avg_batch_inference_ms": self._total_infer / self._batches * 1000.0 if self._batches else 0.0
+            }
+
+    def shutdown(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler() -> Optional[InferenceScheduler]:
+    """
+    Shared scheduler for the deep model, or None when micro-batching is disabled.
+    """
+    global _scheduler
+    if not DEEP_SCHEDULER_ENABLED:
+        return None
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = InferenceScheduler(
+                    analyze_sentiment_bert_batch,
+                    max_batch_size=DEEP_SCHEDULER_MAX_BATCH,
+                    max_wait_ms=DEEP_SCHEDULER_MAX_WAIT_MS
+                )
+    return _scheduler
@@ -0,0 +1,356 @@
+# Write-behind buffer for the global insights counters and the cache in front of /insights
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from typing import Awaitable, Callable, Optional, Tuple
+
+import asyncpg
+
+from app.core.metrics import timed
+
+INSIGHTS_WRITE_BEHIND = os.getenv("INSIGHTS_WRITE_BEHIND", "true").lower() == "true"
+INSIGHTS_FLUSH_INTERVAL_MS = float(os.getenv("INSIGHTS_FLUSH_INTERVAL_MS", "1000"))
+# Pending analyses that trigger a flush before the interval is up
+INSIGHTS_FLUSH_THRESHOLD = int(os.getenv("INSIGHTS_FLUSH_THRESHOLD", "100"))
+# Most analyses ever held in memory, i.e. the most a crash can lose. At this point callers
+# wait for the database instead of buffering more.
+INSIGHTS_MAX_PENDING = int(os.getenv("INSIGHTS_MAX_PENDING", "1000"))
+# With several workers, add to one of this many global_insights_shards rows instead of
+# contending for the single global_insights row. 0 keeps the single row.
+INSIGHTS_COUNTER_SHARDS = int(os.getenv("INSIGHTS_COUNTER_SHARDS", "0"))
+
+# /insights is served from memory for this long; 0 queries the database on every call
+INSIGHTS_CACHE_TTL_SECONDS = float(os.getenv("INSIGHTS_CACHE_TTL_SECONDS", "30"))
+# After the TTL, the old payload is still served for this long while one refresh runs
+INSIGHTS_CACHE_STALE_SECONDS = float(os.getenv("INSIGHTS_CACHE_STALE_SECONDS", "300"))
+
+_SINGLE_ROW_UPDATE = """
+    UPDATE global_insights
+    SET total_analyses = total_analyses + $1,
+        total_emotions = total_emotions + $2
+"""
+
+_SHARD_UPSERT = """
+    INSERT INTO global_insights_shards (shard, total_analyses, total_emotions)
+    VALUES ($1, $2, $3)
+    ON CONFLICT (shard) DO UPDATE
+    SET total_analyses = global_insights_shards.total_analyses + EXCLUDED.total_analyses,
+        total_emotions = global_insights_shards.total_emotions + EXCLUDED.total_emotions
+"""
+
+_SINGLE_ROW_TOTALS = """
+    SELECT COALESCE((SELECT total_analyses FROM global_insights LIMIT 1), 0) AS total_analyses,
+           COALESCE((SELECT total_emotions FROM global_insights LIMIT 1), 0) AS total_emotions
+"""
+
+# The single row keeps the counts from before sharding was switched on
+_SHARDED_TOTALS = """
+    SELECT COALESCE((SELECT total_analyses FROM global_insights LIMIT 1), 0)
+             + COALESCE((SELECT SUM(total_analyses) FROM global_insights_shards), 0) AS total_analyses,
+           COALESCE((SELECT total_emotions FROM global_insights LIMIT 1), 0)
+             + COALESCE((SELECT SUM(total_emotions) FROM global_insights_shards), 0) AS total_emotions
+"""
+
+
+# Everything /insights reports in one statement over the trigger-maintained rollups
+# (database/migrations/001_analysis_history_rollups.sql): the shard rows are added up, a
+# few dozen rows whatever the size of analysis_history
+_ROLLUP_INSIGHTS = """
+    WITH totals AS ({totals}),
+    rollup AS (
+        SELECT SUM(distinct_users)::bigint AS distinct_users,
+               SUM(confidence_sum) AS confidence_sum,
+               SUM(confidence_count)::bigint AS confidence_count
+        FROM analysis_insights_rollup
+    ),
+    sentiments AS (
+        SELECT sentiment, SUM(row_count)::bigint AS row_count
+        FROM analysis_sentiment_counts GROUP BY sentiment HAVING SUM(row_count) > 0
+    )
+    SELECT totals.total_analyses,
+           totals.total_emotions,
+           rollup.confidence_sum / NULLIF(rollup.confidence_count, 0) AS avg_confidence,
+           COALESCE(rollup.distinct_users, 0) AS sessions,
+           ARRAY(SELECT sentiment FROM sentiments ORDER BY sentiment) AS sentiments,
+           ARRAY(SELECT row_count FROM sentiments ORDER BY sentiment) AS sentiment_counts
+    FROM totals, rollup
+"""
+
+
+class InsightsBuffer:
+    """
+    Coalesces /increment-insights calls in memory and writes them to Postgres as one
+    UPDATE every `flush_interval_ms`, or sooner once `flush_threshold` analyses are pending.
+    Runs on the event loop; a failed flush keeps its counts for the next attempt.
+    """
+
+    def __init__(self, flush_interval_ms: float = 1000.0, flush_threshold: int = 100,
+                 max_pending: int = 1000, shards: int = 0, write_behind: bool = True):
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.flush_threshold = max(1, flush_threshold)
+        self.max_pending = max(self.flush_threshold, max_pending)
+        self.shards = shards
+        self.write_behind = write_behind
+        self._pool = None
+        self._analyses = 0
+        self._emotions = 0
+        self._flush_lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        # Stats
+        self._flushes = 0
+        self._failures = 0
+        self._flushed_analyses = 0
+        self._last_flush = None
+
+    def start(self, pool):
+        self._pool = pool
+        if self.write_behind and self._task is None:
+            self._stopping = False
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """
+        Stop the flusher and write out whatever is still pending. Raises if that last
+        write fails, after reporting how many increments were lost.
+        """
+        if self._task is not None:
+            self._stopping = True
+            self._wake.set()
+            await self._task
+            self._task = None
+        # The flusher only logs its own failures; this one has to reach the caller
+        try:
+            await self.flush()
+        except Exception:
+            print(f"[ERROR] Dropping {self._analyses} analyses and {self._emotions} emotions "
+                  "that could not be written to global_insights")
+            raise
+
+    async def add(self, num_emotions: int):
+        self._analyses += 1
+        self._emotions += num_emotions
+        if self._task is None or self._analyses >= self.max_pending:
+            # No flusher, or the database has fallen too far behind: write through
+            try:
+                await self.flush()
+            except Exception:
+                # Reported to the caller as failed, so it must not be counted later either
+                self._analyses -= 1
+                self._emotions -= num_emotions
+                raise
+        elif self._analyses >= self.flush_threshold:
+            self._wake.set()
+
+    async def flush(self):
+        async with self._flush_lock:
+            analyses, emotions = self._analyses, self._emotions
+            if not analyses and not emotions:
+                return
+            self._analyses = self._emotions = 0
+            try:
+                with timed("db"):
+                    async with self._pool.acquire() as conn:
+                        if self.shards > 0:
+                            await conn.execute(_SHARD_UPSERT, random.randrange(self.shards), analyses, emotions)
+                        else:
+                            await conn.execute(_SINGLE_ROW_UPDATE, analyses, emotions)
+            except BaseException:
+                # Also on cancellation: the counts go back into the buffer, not lost
+                self._analyses += analyses
+                self._emotions += emotions
+                self._failures += 1
+                raise
+            self._flushes += 1
+            self._flushed_analyses += analyses
+            self._last_flush = time.monotonic()
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[WARN] Flushing insights counters failed, will retry: {e}")
+
+    @property
+    def totals_query(self) -> str:
+        return _SHARDED_TOTALS if self.shards > 0 else _SINGLE_ROW_TOTALS
+
+    async def totals(self, conn) -> Tuple[int, int]:
+        """
+        Stored totals plus what this process has not written yet.
+        """
+        row = await conn.fetchrow(self.totals_query)
+        return row["total_analyses"] + self._analyses, row["total_emotions"] + self._emotions
+
+    async def read_insights(self, conn) -> dict:
+        """
+        The /insights payload, from the analysis_history rollups in a single query.
+        """
+        try:
+            row = await conn.fetchrow(_ROLLUP_INSIGHTS.format(totals=self.totals_query))
+        except asyncpg.exceptions.UndefinedTableError:
+            print("[WARN] Insights rollup tables are missing; scanning analysis_history. "
+                  "Apply database/migrations/001_analysis_history_rollups.sql")
+            return await self._read_insights_from_history(conn)
+        return {
+            "total_analyses": row["total_analyses"] + self._analyses,
+            "total_emotions": row["total_emotions"] + self._emotions,
+            "avg_confidence": row["avg_confidence"],
+            "sessions": row["sessions"],
+            "sentiment_distribution": dict(zip(row["sentiments"], row["sentiment_counts"]))
+        }
+
+    async def _read_insights_from_history(self, conn) -> dict:
+        # Full scans, for databases the rollup migration has not been applied to yet
+        total_analyses, total_emotions = await self.totals(conn)
+        avg_conf_row = await conn.fetchrow("SELECT AVG((summary->>'confidence')::float) AS avg_confidence FROM analysis_history WHERE summary->>'confidence' IS NOT NULL")
+        sessions_row = await conn.fetchrow("SELECT COUNT(DISTINCT user_id) AS sessions FROM analysis_history")
+        sentiment_rows = await conn.fetch("SELECT summary->>'sentiment' AS sentiment, COUNT(*) AS count FROM analysis_history WHERE summary->>'sentiment' IS NOT NULL GROUP BY sentiment")
+        return {
+            "total_analyses": total_analyses,
+            "total_emotions": total_emotions,
+            "avg_confidence": avg_conf_row["avg_confidence"] if avg_conf_row else None,
+            "sessions": sessions_row["sessions"] if sessions_row else 0,
+            "sentiment_distribution": {row["sentiment"]: row["count"] for row in sentiment_rows}
+        }
+
+    def stats(self) -> dict:
+        return {
+            "write_behind": self._task is not None,
+            "pending_analyses": self._analyses,
+            "pending_emotions": self._emotions,
+            "flushes": self._flushes,
+            "failures": self._failures,
+            "flushed_analyses": self._flushed_analyses,
+            "seconds_since_flush": None if self._last_flush is None else time.monotonic() - self._last_flush,
+            "shards": self.shards
+        }
+
+
+_buffer = None
+
+def get_insights_buffer() -> InsightsBuffer:
+    """
+    Shared insights buffer. Only touched from the event loop, so no lock is needed.
+    """
+    global _buffer
+    if _buffer is None:
+        _buffer = InsightsBuffer(
+            flush_interval_ms=INSIGHTS_FLUSH_INTERVAL_MS,
+            flush_threshold=INSIGHTS_FLUSH_THRESHOLD,
+            max_pending=INSIGHTS_MAX_PENDING,
+            shards=INSIGHTS_COUNTER_SHARDS,
+            write_behind=INSIGHTS_WRITE_BEHIND
+        )
+    return _buffer
+
+
+def payload_etag(payload: dict) -> str:
+    digest = hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header names this ETag (weak comparison, as for GET).
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class InsightsCache:
+    """
+    Keeps the /insights payload for `ttl_seconds`. Once it expires, the old payload is
+    still served for up to `stale_seconds` while a single background refresh runs; after
+    that, callers wait for the refresh, which they all share. Runs on the event loop.
+    """
+
+    def __init__(self, ttl_seconds: float = 30.0, stale_seconds: float = 300.0):
+        self.ttl = ttl_seconds
+        self.stale = stale_seconds
+        self._payload: Optional[dict] = None
+        self._etag: Optional[str] = None
+        self._fetched_at = 0.0
+        self._refresh: Optional[asyncio.Task] = None
+        # Stats
+        self._hits = 0
+        self._stale_hits = 0
+        self._refreshes = 0
+        self._failures = 0
+
+    async def get(self, load: Callable[[], Awaitable[dict]]) -> Tuple[dict, str]:
+        """
+        The payload and its ETag, loading it with `load` when needed.
+        """
+        if self.ttl <= 0:
+            payload = await load()
+            return payload, payload_etag(payload)
+        if self._payload is not None:
+            age = time.monotonic() - self._fetched_at
+            if age < self.ttl:
+                self._hits += 1
+                return self._payload, self._etag
+            if age < self.ttl + self.stale:
+                self._stale_hits += 1
+                self._start_refresh(load)
+                return self._payload, self._etag
+        # A caller that goes away does not cancel the refresh the others are waiting on
+        await asyncio.shield(self._start_refresh(load))
+        return self._payload, self._etag
+
+    def _start_refresh(self, load) -> asyncio.Task:
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.get_running_loop().create_task(self._load(load))
+            self._refresh.add_done_callback(self._refresh_done)
+        return self._refresh
+
+    async def _load(self, load):
+        self._refreshes += 1
+        payload = await load()
+        self._payload = payload
+        self._etag = payload_etag(payload)
+        self._fetched_at = time.monotonic()
+
+    def _refresh_done(self, task: asyncio.Task):
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            # Waiting callers get the error; with a stale payload nobody is waiting
+            self._failures += 1
+            print(f"[WARN] Refreshing insights failed: {error}")
+
+    def stats(self) -> dict:
+        return {
+            "ttl_seconds": self.ttl,
+            "stale_seconds": self.stale,
+            "age_seconds": None if self._payload is None else time.monotonic() - self._fetched_at,
+            "hits": self._hits,
+            "stale_hits": self._stale_hits,
+            "refreshes": self._refreshes,
+            "failures": self._failures
+        }
+
+
+_cache = None
+
+def get_insights_cache() -> InsightsCache:
+    global _cache
+    if _cache is None:
+        _cache = InsightsCache(INSIGHTS_CACHE_TTL_SECONDS, INSIGHTS_CACHE_STALE_SECONDS)
+    return _cache
@@ -0,0 +1,127 @@
+# Language identification for the rule-based model
+import os
+from functools import lru_cache
+from typing import Tuple
+
+from langdetect import DetectorFactory, LangDetectException, detect, detect_langs
+from langdetect.detector_factory import init_factory
+
+# langdetect is randomized unless seeded; a fixed seed makes verdicts reproducible
+DetectorFactory.seed = int(os.getenv("LANGDETECT_SEED", "0"))
+
+LANGUAGE_CACHE_SIZE = int(os.getenv("LANGUAGE_CACHE_SIZE", "50000"))
+# Minimum probability for a whole paragraph to count as English
+PARAGRAPH_ENGLISH_PROBABILITY = 0.9
+# Paragraph detection only looks at this many characters
+PARAGRAPH_SAMPLE_CHARS = 2000
+# Share of English function words that makes detection unnecessary
+STOPWORD_RATIO = 0.25
+
+ENGLISH_STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further
+had has have having he her here hers herself him himself his how i if in into is it its itself
+just me more most my myself no nor not now of off on once only or other our ours ourselves out
+over own same she should so some such than that the their theirs them themselves then there
+these they this those through to too under until up very was we were what when where which
+while who whom why will with would you your yours yourself yourselves im dont didnt cant wont
+isnt its thats ive
+""".split())
+
+# Frequent function words of other languages we see in traffic, none of which are English words
+FOREIGN_STOPWORDS = frozenset("""
+le la les des du et est je tu vous nous une avec pour sur dans pas mais qui
+und der das ist nicht ich du wir sie ein eine auf zu dem sehr auch
+el los las y que por para con una del muy pero como
+il di che sono della gli anche
+não uma os ele ela você muito
+""".split())
+
+
+def init_language_detection():
+    """
+    Load langdetect's language profiles now instead of on the first request.
+    """
+    init_factory()
+
+
+@lru_cache(maxsize=LANGUAGE_CACHE_SIZE)
+def detect_language(text: str) -> str:
+    try:
+        return detect(text)
+    except LangDetectException:
+        return ""
+
+
+def _normalized_words(words):
+    return [w.strip(".,!?").lower() for w in words]
+
+
+def has_english_evidence(text: str, words) -> bool:
+    """
+    True when the text is plain ASCII and made up largely of English function words,
+    which is enough to call it English without running the detector.
+    """
+    if not text.isascii():
+        return False
+    normalized = _normalized_words(words)
+    if any(w in FOREIGN_STOPWORDS for w in normalized):
+        return False
+    hits = sum(1 for w in normalized if w in ENGLISH_STOPWORDS)
+    return hits >= 2 and hits / len(normalized) >= STOPWORD_RATIO
+
+
+def is_ambiguous(text: str, words) -> bool:
+    """
+    Whether a sentence inside an English paragraph still needs its own check:
+    non-ASCII text, or foreign function words.
+    """
+    if not text.isascii():
+        return True
+    return any(w in FOREIGN_STOPWORDS for w in _normalized_words(words))
+
+
+def paragraph_is_english(text: str) -> bool:
+    """
+    Paragraph-level verdict, decided once per document from its (cleaned) text.
+    """
+    return _sample_is_english(text[:PARAGRAPH_SAMPLE_CHARS])
+
+
+@lru_cache(maxsize=1024)
+def _sample_is_english(sample: str) -> bool:
+    if not sample.strip():
+        return False
+    try:
+        languages = detect_langs(sample)
+    except LangDetectException:
+        return False
+    return bool(languages) and languages[0].lang == "en" and languages[0].prob >= PARAGRAPH_ENGLISH_PROBABILITY
+
+
+def english_verdict(text: str, words=None, paragraph_english=False) -> Tuple[bool, bool]:
+    """
+    is_english_text, plus whether the verdict depended on `paragraph_english`. The paragraph
+    verdict may be lazy (anything with a truth value); it is only evaluated when a sentence
+    gets past the cheaper checks.
+    """
+    if words is None:
+        words = text.split()
+    # Bypass language detection for very short sentences
+    if len(words) <= 4:
+        return True, False
+    if has_english_evidence(text, words):
+        return True, False
+    if is_ambiguous(text, words):
+        return detect_language(text) == "en", False
+    if paragraph_english:
+        return True, True
+    return detect_language(text) == "en", True
+
+
+def is_english_text(text: str, words=None, paragraph_english=False) -> bool:
+    """
+    Decide whether a cleaned sentence is English, using the cheapest evidence first:
+    very short sentences, English stop words, the paragraph verdict, and only then langdetect.
+    """
+    return english_verdict(text, words, paragraph_english)[0]
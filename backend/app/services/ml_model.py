@@ -1,26 +1,46 @@
 # Deep learning sentiment analysis using HuggingFace Transformers (DistilBERT)
 import os
-from typing import Optional
+import threading
+from typing import List, Optional
 
-try:
-    from transformers.pipelines import pipeline
-except ImportError:
-    pipeline = None
+# transformers/torch are only imported by build_pipeline, on the first deep request,
+# so rule-only workers never pay for them
+from app.services.inference_backends import DEEP_INFERENCE_BACKEND, DEEP_MODEL_NAME, build_pipeline
 
 _sentiment_pipeline = None
+_pipeline_lock = threading.Lock()
+
+# Identifies the deep model's outputs for result caching; the backend changes scores slightly
+DEEP_MODEL_VERSION = f"{DEEP_MODEL_NAME}@{DEEP_INFERENCE_BACKEND}"
+
+# Maximum number of sentences sent through the model in one padded forward pass
+DEEP_BATCH_SIZE = int(os.getenv("DEEP_BATCH_SIZE", "16"))
 
 def load_bert_pipeline():
     global _sentiment_pipeline
-    if pipeline is None:
-        raise ImportError("transformers library is not installed. Please install with 'pip install transformers torch'.")
     if _sentiment_pipeline is None:
-        _sentiment_pipeline = pipeline(
-            "text-classification",
-            model="j-hartmann/emotion-english-distilroberta-base",
-            return_all_scores=True
-        )
+        # Concurrent first requests wait for a single load instead of each building a copy
+        with _pipeline_lock:
+            if _sentiment_pipeline is None:
+                # Backend is chosen with DEEP_INFERENCE_BACKEND (torch, torch-int8, onnx, onnx-int8).
+                # Raises ImportError when transformers is not installed.
+                _sentiment_pipeline = build_pipeline(DEEP_INFERENCE_BACKEND)
     return _sentiment_pipeline
 
+def _format_emotions(emotions) -> Optional[dict]:
+    # build_pipeline asks for every label's score, so each input yields a list of
+    # {"label", "score"} dicts. Anything else means the pipeline was built wrong.
+    if not isinstance(emotions, list):
+        raise ValueError(f"Expected a list of label scores from the emotion pipeline, got {type(emotions).__name__}")
+    if not emotions:
+        return None
+    top_emotion = max(emotions, key=lambda x: x["score"])
+    return {
+        "emotion": top_emotion["label"],
+        "score": float(top_emotion["score"]),
+        "distribution": {e["label"]: float(e["score"]) for e in emotions}
+    }
+
 def analyze_sentiment_bert(text: str) -> Optional[dict]:
     """
     Analyze emotion using DistilRoBERTa emotion model. Returns top emotion, its score, and full distribution.
@@ -29,13 +49,43 @@ def analyze_sentiment_bert(text: str) -> Optional[dict]:
         pipe = load_bert_pipeline()
         result = pipe(text)
         if result and isinstance(result, list) and len(result) > 0:
-            emotions = result[0]
-            top_emotion = max(emotions, key=lambda x: x["score"])  # type: ignore
-            return {
-                "emotion": top_emotion["label"],  # type: ignore
-                "score": float(top_emotion["score"]),  # type: ignore
-                "distribution": {e["label"]: float(e["score"]) for e in emotions}  # type: ignore
-            }
+            return _format_emotions(result[0])
         return None
     except Exception as e:
+        print(f"[ERROR] Deep model inference failed: {e}")
         return None
+
+def run_pipeline_batches(pipe, texts: List[str], batch_size: int) -> List[Optional[dict]]:
+    """
+    Run sentences through a pipeline in padded batches of similar token length and
+    return formatted results in input order (None for any batch that failed).
+    """
+    results: List[Optional[dict]] = [None] * len(texts)
+    if not texts:
+        return results
+    lengths = [len(ids) for ids in pipe.tokenizer(list(texts), truncation=True)["input_ids"]]
+    order = sorted(range(len(texts)), key=lambda i: lengths[i])
+    for start in range(0, len(order), batch_size):
+        chunk = order[start:start + batch_size]
+        try:
+            outputs = pipe([texts[i] for i in chunk], batch_size=len(chunk), truncation=True)
+        except Exception as e:
+            print(f"[ERROR] Deep model inference failed for a batch of {len(chunk)} sentences: {e}")
+            continue
+        for i, emotions in zip(chunk, outputs):
+            results[i] = _format_emotions(emotions)
+    return results
+
+def analyze_sentiment_bert_batch(texts: List[str], batch_size: Optional[int] = None) -> List[Optional[dict]]:
+    """
+    Analyze many sentences with as few forward passes as possible. Sentences are sorted by
+    token length so each padded batch holds similarly sized inputs, and results are returned
+    in input order (None for any sentence that could not be scored).
+    """
+    if not texts:
+        return []
+    try:
+        return run_pipeline_batches(load_bert_pipeline(), texts, batch_size or DEEP_BATCH_SIZE)
+    except Exception as e:
+        print(f"[ERROR] Deep model inference failed: {e}")
+        return [None] * len(texts)
@@ -0,0 +1,81 @@
+# Multi-process execution of the rule-based model for large documents
+import math
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+# 0 disables the pool; everything then runs inline in the request thread
+RULE_POOL_WORKERS = int(os.getenv("RULE_POOL_WORKERS", "0"))
+# Below this many sentences the IPC overhead outweighs the extra cores
+RULE_POOL_MIN_SENTENCES = int(os.getenv("RULE_POOL_MIN_SENTENCES", "200"))
+# Shards per worker, so a slow shard does not leave the other workers idle
+_SHARDS_PER_WORKER = 4
+
+
+def _init_worker():
+    # Load every lexicon once per worker process instead of once per shard
+    from app.services.language import init_language_detection
+    from app.services.sentiment_rule import ensemble_prepared, prepare_sentence
+
+    init_language_detection()
+    ensemble_prepared(prepare_sentence("This is a good warm-up sentence for the lexicons."))
+
+
+def _score_shard(shard: list) -> List[Tuple[dict, bool]]:
+    from app.services.analysis import score_rule_sentences
+
+    sentences, hints = zip(*shard)
+    return [(score.to_cache(), score.paragraph_dependent)
+            for score in score_rule_sentences(list(sentences), list(hints))]
+
+
+class RulePool:
+    """
+    Shards sentences across worker processes and reassembles the results in order.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        return self._executor
+
+    def score(self, sentences: List[str], english_hints: list) -> List[Tuple[dict, bool]]:
+        """
+        Cache dicts for `sentences` in order, each with its paragraph_dependent flag.
+        """
+        items = list(zip(sentences, english_hints))
+        shard_size = max(1, math.ceil(len(items) / (self.workers * _SHARDS_PER_WORKER)))
+        shards = [items[i:i + shard_size] for i in range(0, len(items), shard_size)]
+        results = []
+        for shard_results in self._get_executor().map(_score_shard, shards):
+            results.extend(shard_results)
+        return results
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+_pool = RulePool(RULE_POOL_WORKERS) if RULE_POOL_WORKERS > 0 else None
+
+def get_rule_pool(num_sentences: int) -> Optional[RulePool]:
+    """
+    The shared pool when it is enabled and the document is big enough to benefit, else None.
+    """
+    if _pool is None or num_sentences < RULE_POOL_MIN_SENTENCES:
+        return None
+    return _pool
+
+def shutdown_rule_pool():
+    if _pool is not None:
+        _pool.shutdown()
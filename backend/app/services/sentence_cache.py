@@ -0,0 +1,330 @@
+# Content-addressed cache for per-sentence results (in-process LRU + shared SQLite store)
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+SENTENCE_CACHE_ENABLED = os.getenv("SENTENCE_CACHE_ENABLED", "true").lower() == "true"
+SENTENCE_CACHE_SIZE = int(os.getenv("SENTENCE_CACHE_SIZE", "10000"))
+# Shared by every uvicorn worker on the machine and kept across restarts. Empty disables the disk tier.
+SENTENCE_CACHE_PATH = os.getenv("SENTENCE_CACHE_PATH", os.path.join("cache", "sentence_cache.sqlite3"))
+SENTENCE_CACHE_DISK_MAX_ROWS = int(os.getenv("SENTENCE_CACHE_DISK_MAX_ROWS", "1000000"))
+# Disk writes waiting for the writer thread; past this, new results only go to the memory tier
+SENTENCE_CACHE_MAX_PENDING = int(os.getenv("SENTENCE_CACHE_MAX_PENDING", "10000"))
+
+# Trim the disk tier back under its row limit once every this many writes
+_TRIM_EVERY = 1000
+
+
+def normalize_sentence(sentence: str) -> str:
+    return " ".join(sentence.split())
+
+
+def cache_key(sentence: str, model: str, version: str) -> str:
+    raw = f"{model}\x00{version}\x00{normalize_sentence(sentence)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SentenceCache:
+    """
+    Two-tier cache of sentence results keyed by normalized sentence + model + model version.
+    Values are plain JSON-serializable dicts. Disk errors are logged and treated as misses so
+    the cache can never fail a request. Disk writes are queued and committed in batches by a
+    writer thread, off the request path.
+    """
+
+    def __init__(self, max_entries: int = 10000, path: Optional[str] = None,
+                 disk_max_rows: int = 1000000, max_pending: int = 10000):
+        self.max_entries = max_entries
+        self.path = path or None
+        self.disk_max_rows = disk_max_rows
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._writes = 0
+        # Each item is one put_many call's rows; None stops the writer
+        self._pending = queue.Queue(maxsize=max(1, max_pending))
+        self._writer: Optional[threading.Thread] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.dropped_writes = 0
+        if self.path:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = self._connection()
+            if conn is not None:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS sentence_cache (
+                        key TEXT PRIMARY KEY,
+                        model TEXT NOT NULL,
+                        version TEXT NOT NULL,
+                        value TEXT NOT NULL,
+                        created_at REAL NOT NULL
+                    )
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_sentence_cache_model ON sentence_cache(model, version)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_sentence_cache_created ON sentence_cache(created_at)")
+                conn.commit()
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        conn = getattr(self._local, "conn", None)
+        if conn is None and self.path:
+            try:
+                # Closed by close(), from whichever thread shuts the cache down
+                conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                self._local.conn = conn
+                with self._lock:
+                    self._connections.append(conn)
+            except sqlite3.Error as e:
+                print(f"[WARN] Sentence cache disk tier unavailable: {e}")
+                self.path = None
+                return None
+        return conn
+
+    def _remember(self, key: str, value: dict):
+        # Caller holds self._lock
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, sentences: List[str], model: str, version: str) -> List[Optional[dict]]:
+        keys = [cache_key(s, model, version) for s in sentences]
+        results: List[Optional[dict]] = [None] * len(keys)
+        missing: Dict[str, List[int]] = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                value = self._memory.get(key)
+                if value is not None:
+                    self._memory.move_to_end(key)
+                    results[i] = value
+                    self.memory_hits += 1
+                else:
+                    missing.setdefault(key, []).append(i)
+
+        if missing and self.path:
+            found = self._disk_get(list(missing))
+            with self._lock:
+                for key, value in found.items():
+                    self._remember(key, value)
+                    for i in missing.pop(key):
+                        results[i] = value
+                        self.disk_hits += 1
+
+        with self._lock:
+            self.misses += sum(len(indexes) for indexes in missing.values())
+        return results
+
+    def _disk_get(self, keys: List[str]) -> Dict[str, dict]:
+        found = {}
+        conn = self._connection()
+        if conn is None:
+            return found
+        try:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, value FROM sentence_cache WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, value in rows:
+                    found[key] = json.loads(value)
+        except sqlite3.Error as e:
+            print(f"[WARN] Sentence cache read failed: {e}")
+        return found
+
+    def put_many(self, sentences: List[str], values: List[dict], model: str, version: str):
+        """
+        Store results in the memory tier now and queue them for the disk tier.
+        """
+        if not sentences:
+            return
+        keys = [cache_key(s, model, version) for s in sentences]
+        with self._lock:
+            for key, value in zip(keys, values):
+                self._remember(key, value)
+        if not self.path:
+            return
+        self._ensure_writer()
+        try:
+            self._pending.put_nowait((keys, values, model, version, time.time()))
+        except queue.Full:
+            with self._lock:
+                self.dropped_writes += len(keys)
+
+    def _ensure_writer(self):
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._run_writer, name="sentence-cache-writer", daemon=True)
+                    self._writer.start()
+
+    def _run_writer(self):
+        while True:
+            batch = [self._pending.get()]
+            # Everything queued meanwhile goes into the same transaction
+            while True:
+                try:
+                    batch.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = None in batch
+            try:
+                self._write([item for item in batch if item is not None])
+            finally:
+                for _ in batch:
+                    self._pending.task_done()
+            if stopping:
+                return
+
+    def _write(self, batch):
+        if not batch:
+            return
+        conn = self._connection()
+        if conn is None:
+            return
+        rows = [
+            (key, model, version, json.dumps(value), created_at)
+            for keys, values, model, version, created_at in batch
+            for key, value in zip(keys, values)
+        ]
+        self._writes += len(rows)
+        trim = self._writes >= _TRIM_EVERY
+        if trim:
+            self._writes = 0
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO sentence_cache (key, model, version, value, created_at) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            if trim:
+                conn.execute("""
+                    DELETE FROM sentence_cache WHERE key IN (
+                        SELECT key FROM sentence_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?
+                    )
+                """, (self.disk_max_rows,))
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"[WARN] Sentence cache write failed: {e}")
+
+    def flush(self):
+        """
+        Wait until every queued write has been committed.
+        """
+        if self._writer is not None:
+            self._pending.join()
+
+    def close(self):
+        """
+        Commit queued writes, stop the writer and close every disk connection.
+        """
+        if self._writer is not None:
+            self._pending.put(None)
+            self._writer.join()
+            self._writer = None
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                print(f"[WARN] Could not close sentence cache connection: {e}")
+        self._local = threading.local()
+
+    def invalidate(self, model: Optional[str] = None, keep_version: Optional[str] = None) -> int:
+        """
+        Drop cached results. With `model`, only that model's entries are dropped; with
+        `keep_version` as well, entries of the current version survive (used after an upgrade).
+        Returns the number of rows removed from the disk tier.
+        """
+        # Queued writes would otherwise land after the delete
+        self.flush()
+        with self._lock:
+            # Memory keys are hashes, so the memory tier is simply cleared
+            self._memory.clear()
+        conn = self._connection()
+        if conn is None:
+            return 0
+        try:
+            if model is None:
+                cursor = conn.execute("DELETE FROM sentence_cache")
+            elif keep_version is None:
+                cursor = conn.execute("DELETE FROM sentence_cache WHERE model = ?", (model,))
+            else:
+                cursor = conn.execute("DELETE FROM sentence_cache WHERE model = ? AND version != ?", (model, keep_version))
+            conn.commit()
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            print(f"[WARN] Sentence cache invalidation failed: {e}")
+            return 0
+
+    def purge_stale(self, versions: Dict[str, str]) -> int:
+        """
+        Remove disk entries whose model version no longer matches the running code.
+        """
+        self.flush()
+        conn = self._connection()
+        if conn is None:
+            return 0
+        removed = 0
+        try:
+            for model, version in versions.items():
+                cursor = conn.execute("DELETE FROM sentence_cache WHERE model = ? AND version != ?", (model, version))
+                removed += cursor.rowcount
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"[WARN] Sentence cache purge failed: {e}")
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "memory_capacity": self.max_entries,
+                "disk_enabled": bool(self.path),
+                "pending_writes": self._pending.qsize(),
+                "dropped_writes": self.dropped_writes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_sentence_cache() -> Optional[SentenceCache]:
+    """
+    Shared sentence cache, or None when caching is disabled.
+    """
+    global _cache
+    if not SENTENCE_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SentenceCache(SENTENCE_CACHE_SIZE, SENTENCE_CACHE_PATH, SENTENCE_CACHE_DISK_MAX_ROWS,
+                                       SENTENCE_CACHE_MAX_PENDING)
+    return _cache
+
+def close_sentence_cache():
+    """
+    Write out queued results and close the disk tier. Called on shutdown.
+    """
+    global _cache
+    with _cache_lock:
+        cache, _cache = _cache, None
+    if cache is not None:
+        cache.close()
@@ -1,61 +1,196 @@
+import os
 import re
-from langdetect import detect, LangDetectException
 import emoji
-from textblob import TextBlob
+from textblob.en import sentiment as pattern_sentiment
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from app.services.language import english_verdict, is_english_text
+from app.core.metrics import timed
+from app.services.vader_batch import BatchVader
 
 vader = SentimentIntensityAnalyzer()
+# Same scores as `vader`, computed for many sentences at once
+batch_vader = BatchVader(vader)
+# Below this many sentences the NumPy setup costs more than scoring one by one
+VADER_BATCH_MIN_SENTENCES = int(os.getenv("VADER_BATCH_MIN_SENTENCES", "8"))
+
+# Bump when the rule pipeline changes in a way that alters scores (invalidates cached results)
+RULE_MODEL_VERSION = "vader+textblob-2"
+
+# URLs and special characters are stripped in one scan. URL matches can only start on word
+# characters, which the special-character branch never consumes, so this gives the same result
+# as stripping URLs first and special characters second.
+_URL_OR_SPECIAL = re.compile(r"http\S+|www\S+|[^\w\s.,!?]+")
+# First characters of every known emoji sequence; text without any of them has nothing to demojize
+_EMOJI_START = frozenset(e[0] for e in emoji.EMOJI_DATA)
+
+def _may_contain_emoji(text):
+    return not text.isascii() and not _EMOJI_START.isdisjoint(text)
+
+def _normalize(text):
+    # split()/join collapses and trims whitespace without another regex pass
+    return " ".join(_URL_OR_SPECIAL.sub("", text).split())
 
 def clean_text(text):
     """
     Clean text by removing URLs, special characters, and converting emojis to text.
     """
-    text = emoji.demojize(text, delimiters=(" ", " "))
-    text = re.sub(r"http\S+|www\S+", "", text)  # Remove URLs
-    text = re.sub(r"[^\w\s.,!?]", "", text)     # Remove special chars except punctuation
-    text = re.sub(r"\s+", " ", text).strip()     # Remove extra whitespace
-    return text
+    if _may_contain_emoji(text):
+        text = emoji.demojize(text, delimiters=(" ", " "))
+    return _normalize(text)
+
+def clean_texts(texts):
+    """
+    Batch version of clean_text. Skips emoji handling entirely when no text in the batch has any.
+    """
+    if not any(_may_contain_emoji(t) for t in texts):
+        return [_normalize(t) for t in texts]
+    return [clean_text(t) for t in texts]
+
+class PreparedSentence:
+    """
+    A sentence after the single preprocessing pass: cleaned text, its words, the
+    language verdict and, for English sentences, the polarity tokens. The scorers below
+    consume this so cleaning, language detection and tokenization run once per sentence.
+    `paragraph_dependent` is set when the verdict came from the surrounding document
+    rather than the sentence itself.
+    """
+    __slots__ = ("original", "cleaned", "words", "english", "paragraph_dependent", "tokens")
+
+    def __init__(self, original, cleaned, words, english, paragraph_dependent=False, tokens=None):
+        self.original = original
+        self.cleaned = cleaned
+        self.words = words
+        self.english = english
+        self.paragraph_dependent = paragraph_dependent
+        self.tokens = tokens
+
+def prepare_sentence(text, paragraph_english=False):
+    """
+    Clean a raw sentence, detect its language and tokenize it once. `paragraph_english` is
+    the verdict for the surrounding document, which lets unambiguous sentences skip detection.
+    """
+    with timed("clean"):
+        cleaned = clean_text(text)
+    words = cleaned.split()
+    english, paragraph_dependent, tokens = False, False, None
+    if cleaned:
+        with timed("langdetect"):
+            english, paragraph_dependent = english_verdict(cleaned, words, paragraph_english)
+    if english:
+        # Only English sentences are scored
+        with timed("tokenize"):
+            tokens = polarity_tokens(cleaned)
+    return PreparedSentence(text, cleaned, words, english, paragraph_dependent, tokens)
+
+def _prepare_as_is(text):
+    # For the legacy wrappers, which score the text they are given without cleaning it
+    words = text.split() if text else []
+    english = bool(text) and is_english_text(text, words)
+    return PreparedSentence(text, text, words, english)
 
 def is_english(text):
-    # Bypass language detection for very short sentences
-    if len(text.split()) <= 4:
-        return True
-    try:
-        return detect(text) == 'en'
-    except LangDetectException:
-        return False
+    return is_english_text(text)
 
-def get_vader_sentiment(text):
+def vader_score(prepared):
     """
-    Get sentiment using VADER. Returns: compound score between -1 (negative) to 1 (positive)
+    VADER compound score (-1 to 1) for a prepared sentence, or None if it is empty or not English.
     """
-    if not text or not is_english(text):
+    if not prepared.english:
         return None
-    score = vader.polarity_scores(text)
-    return score['compound']
+    with timed("vader"):
+        return vader.polarity_scores(prepared.cleaned)['compound']
 
-def get_textblob_sentiment(text):
+def vader_scores(prepared_sentences):
     """
-    Get sentiment polarity using TextBlob. Returns: polarity between -1.0 (negative) and 1.0 (positive)
+    Batch version of vader_score: one vectorized pass over every English sentence.
+    """
+    english = [p.cleaned for p in prepared_sentences if p.english]
+    if len(english) < VADER_BATCH_MIN_SENTENCES:
+        return [vader_score(p) for p in prepared_sentences]
+    with timed("vader"):
+        compounds = iter(batch_vader.compound_scores(english))
+    return [next(compounds) if p.english else None for p in prepared_sentences]
+
+def polarity_tokens(text):
+    """
+    The words PatternAnalyzer scores: pattern's tokenizer output, re-split on whitespace.
+    """
+    return " ".join(pattern_sentiment.tokenizer(text)).split()
+
+def _polarity_tokens(prepared):
+    # Prepared sentences built without prepare_sentence are tokenized on first use
+    if prepared.tokens is None:
+        prepared.tokens = polarity_tokens(prepared.cleaned)
+    return prepared.tokens
+
+def _polarity(tokens):
+    # Same arithmetic as pattern's Sentiment.__call__, without the TextBlob object and the
+    # namedtuple class PatternAnalyzer builds on every call
+    total, count = 0, 0
+    for _, polarity, _, _ in pattern_sentiment.assessments(((w.lower(), None) for w in tokens), True):
+        total += polarity
+        count += 1
+    return total / float(count or 1)
+
+def textblob_score(prepared):
     """
-    if not text or not is_english(text):
+    TextBlob polarity (-1.0 to 1.0) for a prepared sentence, or None if it is empty or not English.
+    Identical to TextBlob(prepared.cleaned).sentiment.polarity.
+    """
+    if not prepared.english:
         return None
-    return TextBlob(text).sentiment.polarity
+    with timed("textblob"):
+        return _polarity(_polarity_tokens(prepared))
 
-def ensemble_sentiment(text, vader_weight=0.5, textblob_weight=0.5):
+def textblob_scores(prepared_sentences):
     """
-    Combine VADER and TextBlob scores with optional weighting. Returns average score and confidence.
+    Batch version of textblob_score, timed as one stage.
     """
-    cleaned = clean_text(text)
-    vader_score = get_vader_sentiment(cleaned)
-    textblob_score = get_textblob_sentiment(cleaned)
-    if vader_score is None and textblob_score is None:
+    if not prepared_sentences:
+        return []
+    with timed("textblob"):
+        return [_polarity(_polarity_tokens(p)) if p.english else None for p in prepared_sentences]
+
+def ensemble_prepared(prepared):
+    """
+    Average of the VADER and TextBlob scores for a prepared sentence. Returns average score and confidence.
+    """
+    return _combine_scores(vader_score(prepared), textblob_score(prepared))
+
+def ensemble_prepared_batch(prepared_sentences):
+    """
+    Batch version of ensemble_prepared, with VADER and TextBlob scored in bulk.
+    """
+    vader_results = vader_scores(prepared_sentences)
+    textblob_results = textblob_scores(prepared_sentences)
+    return [_combine_scores(v, t) for v, t in zip(vader_results, textblob_results)]
+
+def _combine_scores(vader_result, textblob_result):
+    if vader_result is None and textblob_result is None:
         return 0.0, 0.0  # Neutral, low confidence
-    scores = [s for s in [vader_score, textblob_score] if s is not None]
+    scores = [s for s in [vader_result, textblob_result] if s is not None]
     avg_score = sum(scores) / len(scores) if scores else 0.0
     confidence = len(scores) / 2  # 1.0 if both, 0.5 if only one
     return avg_score, confidence
 
+def get_vader_sentiment(text):
+    """
+    Get sentiment using VADER. Returns: compound score between -1 (negative) to 1 (positive)
+    """
+    return vader_score(_prepare_as_is(text))
+
+def get_textblob_sentiment(text):
+    """
+    Get sentiment polarity using TextBlob. Returns: polarity between -1.0 (negative) and 1.0 (positive)
+    """
+    return textblob_score(_prepare_as_is(text))
+
+def ensemble_sentiment(text, vader_weight=0.5, textblob_weight=0.5):
+    """
+    Combine VADER and TextBlob scores with optional weighting. Returns average score and confidence.
+    """
+    return ensemble_prepared(prepare_sentence(text))
+
 def classify_sentiment(score):
     """
     Convert numerical score into sentiment label.
@@ -0,0 +1,268 @@
+# Batch VADER scorer: the rules of SentimentIntensityAnalyzer.polarity_scores evaluated with NumPy
+# over whole batches of sentences, against an array-backed copy of the VADER lexicon
+import string
+from typing import List, Sequence
+
+import numpy as np
+from vaderSentiment.vaderSentiment import (
+    BOOSTER_DICT,
+    C_INCR,
+    N_SCALAR,
+    NEGATE,
+    SPECIAL_CASES,
+    SentimentIntensityAnalyzer
+)
+
+# Words the rules compare against directly
+_MARKERS = ("no", "or", "nor", "kind", "of", "never", "so", "this", "without", "doubt", "least", "at", "very", "but")
+# Words that can take part in a multi-word special case or booster n-gram
+_IDIOM_WORDS = frozenset(
+    word for key in list(SPECIAL_CASES) + list(BOOSTER_DICT) if " " in key for word in key.split()
+)
+
+
+def _strip_punc_if_word(token: str) -> str:
+    # Same as SentiText._strip_punc_if_word: keep short tokens, which are likely emoticons
+    stripped = token.strip(string.punctuation)
+    if len(stripped) <= 2:
+        return token
+    return stripped
+
+
+def _shift_back(values: np.ndarray, k: int, fill) -> np.ndarray:
+    # values[i - k] at position i (the k-th previous token)
+    shifted = np.full_like(values, fill)
+    if k < len(values):
+        shifted[k:] = values[:-k]
+    return shifted
+
+
+def _shift_forward(values: np.ndarray, k: int, fill) -> np.ndarray:
+    # values[i + k] at position i (the k-th next token)
+    shifted = np.full_like(values, fill)
+    if k < len(values):
+        shifted[:-k] = values[k:]
+    return shifted
+
+
+class BatchVader:
+    """
+    Compound scores identical to SentimentIntensityAnalyzer.polarity_scores(text)["compound"],
+    computed for many sentences at once. Tokens are mapped to integer ids; lexicon valences,
+    booster weights and rule markers live in arrays indexed by id, so the per-token rules
+    (negation, boosters, ALL CAPS, "no", "least", "kind of") are vectorized over every token
+    of the batch. Special-case idioms and the "but" rule, which are rare and order-sensitive,
+    reuse the reference logic on the few sentences that need them.
+    """
+
+    def __init__(self, analyzer: SentimentIntensityAnalyzer):
+        self.emojis = analyzer.emojis
+        self._emoji_chars = frozenset(k for k in analyzer.emojis if len(k) == 1)
+
+        words = set(analyzer.lexicon) | {w for w in BOOSTER_DICT if " " not in w} | set(NEGATE)
+        words |= set(_MARKERS) | _IDIOM_WORDS
+        # Id 0 is every word the rules know nothing about
+        self.vocab = {word: i for i, word in enumerate(sorted(words), start=1)}
+        size = len(self.vocab) + 1
+        self.in_lexicon = np.zeros(size, dtype=bool)
+        self.valence = np.zeros(size, dtype=np.float64)
+        self.is_booster = np.zeros(size, dtype=bool)
+        self.booster = np.zeros(size, dtype=np.float64)
+        self.negates = np.zeros(size, dtype=bool)
+        self.is_idiom_word = np.zeros(size, dtype=bool)
+        for word, i in self.vocab.items():
+            if word in analyzer.lexicon:
+                self.in_lexicon[i] = True
+                self.valence[i] = analyzer.lexicon[word]
+            if word in BOOSTER_DICT:
+                self.is_booster[i] = True
+                self.booster[i] = BOOSTER_DICT[word]
+            self.negates[i] = word in NEGATE or "n't" in word
+            self.is_idiom_word[i] = word in _IDIOM_WORDS
+        self.ids = {word: self.vocab[word] for word in _MARKERS}
+
+    def _replace_emojis(self, text: str) -> str:
+        # Same as the emoji loop at the top of polarity_scores
+        if self._emoji_chars.isdisjoint(text):
+            return text
+        parts = []
+        prev_space = True
+        for char in text:
+            if char in self.emojis:
+                if not prev_space:
+                    parts.append(" ")
+                parts.append(self.emojis[char])
+                prev_space = False
+            else:
+                parts.append(char)
+                prev_space = char == " "
+        return "".join(parts)
+
+    @staticmethod
+    def _special_idioms_check(valence, lowers: List[str], i: int, end: int):
+        # SentimentIntensityAnalyzer._special_idioms_check on flat token positions
+        onezero = f"{lowers[i - 1]} {lowers[i]}"
+        twoonezero = f"{lowers[i - 2]} {lowers[i - 1]} {lowers[i]}"
+        twoone = f"{lowers[i - 2]} {lowers[i - 1]}"
+        threetwoone = f"{lowers[i - 3]} {lowers[i - 2]} {lowers[i - 1]}"
+        threetwo = f"{lowers[i - 3]} {lowers[i - 2]}"
+        for seq in (onezero, twoonezero, twoone, threetwoone, threetwo):
+            if seq in SPECIAL_CASES:
+                valence = SPECIAL_CASES[seq]
+                break
+        if end - 1 > i:
+            zeroone = f"{lowers[i]} {lowers[i + 1]}"
+            if zeroone in SPECIAL_CASES:
+                valence = SPECIAL_CASES[zeroone]
+        if end - 1 > i + 1:
+            zeroonetwo = f"{lowers[i]} {lowers[i + 1]} {lowers[i + 2]}"
+            if zeroonetwo in SPECIAL_CASES:
+                valence = SPECIAL_CASES[zeroonetwo]
+        for n_gram in (threetwoone, threetwo, twoone):
+            if n_gram in BOOSTER_DICT:
+                valence = valence + BOOSTER_DICT[n_gram]
+        return valence
+
+    def compound_scores(self, texts: Sequence[str]) -> List[float]:
+        n = len(texts)
+        if n == 0:
+            return []
+        prepared = [self._replace_emojis(t).strip() for t in texts]
+        tokens = [[_strip_punc_if_word(w) for w in t.split()] for t in prepared]
+        lengths = np.fromiter((len(t) for t in tokens), dtype=np.int64, count=n)
+        flat = [w for sentence in tokens for w in sentence]
+        lowers = [w.lower() for w in flat]
+        total = len(flat)
+
+        # Punctuation emphasis only depends on the text
+        ep_count = np.minimum(np.fromiter((t.count("!") for t in prepared), dtype=np.int64, count=n), 4)
+        qm_count = np.fromiter((t.count("?") for t in prepared), dtype=np.int64, count=n)
+        amplifier = ep_count * 0.292 + np.where(qm_count > 1, np.where(qm_count <= 3, qm_count * 0.18, 0.96), 0.0)
+
+        sums = np.zeros(n, dtype=np.float64)
+        if total:
+            sentiments = self._token_sentiments(flat, lowers, lengths)
+            sums = self._sequential_sums(sentiments, lengths)
+
+        sums = np.where(sums > 0, sums + amplifier, np.where(sums < 0, sums - amplifier, sums))
+        compound = np.clip(sums / np.sqrt(sums * sums + 15), -1.0, 1.0)
+        # Python's round, not np.round, so ties and representation errors match the reference
+        return [round(c, 4) for c in compound.tolist()]
+
+    def _token_sentiments(self, flat: List[str], lowers: List[str], lengths: np.ndarray) -> np.ndarray:
+        total = len(flat)
+        n = len(lengths)
+        ids = np.fromiter((self.vocab.get(w, 0) for w in lowers), dtype=np.int64, count=total)
+        upper = np.fromiter((w.isupper() for w in flat), dtype=bool, count=total)
+        has_nt = np.fromiter(("n't" in w for w in lowers), dtype=bool, count=total)
+
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        sentence = np.repeat(np.arange(n), lengths)
+        pos = np.arange(total) - starts[sentence]
+        length = lengths[sentence]
+
+        caps = np.bincount(sentence, weights=upper, minlength=n)
+        cap_diff = ((caps > 0) & (caps < lengths))[sentence]
+
+        in_lex = self.in_lexicon[ids]
+        negated = self.negates[ids] | has_nt
+        marker = {word: ids == i for word, i in self.ids.items()}
+
+        def prev(values, k, fill=False):
+            return _shift_back(values, k, fill)
+
+        has_next = pos < length - 1
+        has = {k: pos >= k for k in (1, 2, 3)}
+
+        skip = self.is_booster[ids] | (marker["kind"] & has_next & _shift_forward(marker["of"], 1, False))
+        active = in_lex & ~skip
+
+        base = self.valence[ids]
+        valence = base.copy()
+        # "no" right before another lexicon word negates that word instead of scoring itself
+        valence[marker["no"] & has_next & _shift_forward(in_lex, 1, False)] = 0.0
+        no_before = (has[1] & prev(marker["no"], 1)) | (has[2] & prev(marker["no"], 2)) | (
+            has[3] & prev(marker["no"], 3) & (prev(marker["or"], 1) | prev(marker["nor"], 1)))
+        valence = np.where(no_before, base * N_SCALAR, valence)
+        caps_word = upper & cap_diff
+        valence = np.where(caps_word, np.where(valence > 0, valence + C_INCR, valence - C_INCR), valence)
+
+        idiom_candidates = None
+        for k in (1, 2, 3):
+            prev_id = prev(ids, k, 0)
+            applies = has[k] & ~self.in_lexicon[prev_id]
+            is_booster = self.is_booster[prev_id]
+            scalar = np.where(is_booster, np.where(valence < 0, -self.booster[prev_id], self.booster[prev_id]), 0.0)
+            booster_caps = is_booster & prev(upper, k) & cap_diff
+            scalar = np.where(booster_caps, np.where(valence > 0, scalar + C_INCR, scalar - C_INCR), scalar)
+            if k == 2:
+                scalar = np.where(scalar != 0, scalar * 0.95, scalar)
+            elif k == 3:
+                scalar = np.where(scalar != 0, scalar * 0.9, scalar)
+            valence = np.where(applies, valence + scalar, valence)
+
+            # _negation_check for start_i = k - 1
+            if k == 1:
+                factor = np.where(prev(negated, 1), N_SCALAR, 1.0)
+            elif k == 2:
+                so_this = prev(marker["so"], 1) | prev(marker["this"], 1)
+                emphasis = prev(marker["never"], 2) & so_this
+                no_op = prev(marker["without"], 2) & prev(marker["doubt"], 1)
+                factor = np.where(emphasis, 1.25, np.where(no_op, 1.0, np.where(prev(negated, 2), N_SCALAR, 1.0)))
+            else:
+                emphasis = (prev(marker["never"], 3) & (prev(marker["so"], 2) | prev(marker["this"], 2))) | (
+                    prev(marker["so"], 1) | prev(marker["this"], 1))
+                no_op = prev(marker["without"], 3) & (prev(marker["doubt"], 2) | prev(marker["doubt"], 1))
+                factor = np.where(emphasis, 1.25, np.where(no_op, 1.0, np.where(prev(negated, 3), N_SCALAR, 1.0)))
+                idiom_window = self.is_idiom_word[ids].copy()
+                for j in (1, 2, 3):
+                    idiom_window |= has[j] & prev(self.is_idiom_word[ids], j)
+                for j in (1, 2):
+                    idiom_window |= (pos < length - j) & _shift_forward(self.is_idiom_word[ids], j, False)
+                idiom_candidates = np.flatnonzero(applies & active & idiom_window)
+            valence = np.where(applies & (factor != 1.0), valence * factor, valence)
+
+            if k == 3 and len(idiom_candidates):
+                ends = (starts + lengths)[sentence]
+                values = valence.tolist()
+                for i in idiom_candidates.tolist():
+                    values[i] = self._special_idioms_check(values[i], lowers, i, int(ends[i]))
+                valence = np.asarray(values, dtype=np.float64)
+
+        # _least_check
+        least_before = ~prev(in_lex, 1) & prev(marker["least"], 1)
+        not_at_very = ~(prev(marker["at"], 2) | prev(marker["very"], 2))
+        least = (has[2] & least_before & not_at_very) | ((pos == 1) & least_before)
+        valence = np.where(least, valence * N_SCALAR, valence)
+
+        sentiments = np.where(active, valence, 0.0)
+
+        # The "but" rule is order-sensitive in the reference (it rescales by list.index, so
+        # repeated values interact), so the affected sentences go through it verbatim
+        but_sentences = np.unique(sentence[marker["but"]])
+        if len(but_sentences):
+            values = sentiments.tolist()
+            for s in but_sentences.tolist():
+                start, end = int(starts[s]), int(starts[s] + lengths[s])
+                values[start:end] = SentimentIntensityAnalyzer._but_check(lowers[start:end], values[start:end])
+            sentiments = np.asarray(values, dtype=np.float64)
+        return sentiments
+
+    @staticmethod
+    def _sequential_sums(sentiments: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        # Left-to-right per sentence, like Python's sum(), so rounding matches the reference
+        # (np.add.reduce uses pairwise summation). One vectorized step per token position.
+        n = len(lengths)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        order = np.argsort(-lengths, kind="stable")
+        sorted_lengths = lengths[order]
+        sorted_starts = starts[order]
+        longest = int(sorted_lengths[0])
+        # Sentences with a token at position j are a prefix of the length-sorted order
+        counts = np.searchsorted(-sorted_lengths, -np.arange(1, longest + 1), side="right")
+        sums = np.zeros(n, dtype=np.float64)
+        for j, count in enumerate(counts.tolist()):
+            sums[:count] += sentiments[sorted_starts[:count] + j]
+        result = np.empty(n, dtype=np.float64)
+        result[order] = sums
+        return result
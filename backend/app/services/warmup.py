@@ -0,0 +1,190 @@
+# Startup warm-up of the analysis engines and the readiness state served by /ready
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# Load every enabled engine in the background at startup; /ready stays 503 until they are done.
+# Off by default: engines then load on first use.
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "false").lower() == "true"
+# A failed engine is tried again after this long, doubling each time, up to WARMUP_MAX_ATTEMPTS tries
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "30"))
+WARMUP_MAX_ATTEMPTS = int(os.getenv("WARMUP_MAX_ATTEMPTS", "5"))
+
+# Engines each model needs to serve requests
+MODEL_ENGINES = {
+    "rule": ("langdetect", "vader", "textblob"),
+    "deep": ("deep",),
+}
+
+WARMUP_SENTENCES = [
+    "I am so happy with how this turned out!",
+    "This is the worst service I have ever had.",
+    "The meeting was moved to Tuesday afternoon.",
+    "Je ne sais pas si je vais venir demain.",
+]
+
+
+def _warm_langdetect():
+    from app.services.language import detect_language, init_language_detection
+
+    init_language_detection()
+    for sentence in WARMUP_SENTENCES:
+        detect_language(sentence)
+
+
+def _warm_vader():
+    from app.services.sentiment_rule import vader
+
+    for sentence in WARMUP_SENTENCES:
+        vader.polarity_scores(sentence)
+
+
+def _warm_textblob():
+    # Loads the sentence segmenter (Punkt tables unless SENTENCE_SEGMENTER=rule) and the
+    # PatternAnalyzer lexicon
+    from textblob import TextBlob
+    from app.utils.utils import split_into_sentences
+
+    split_into_sentences(" ".join(WARMUP_SENTENCES))
+    for sentence in WARMUP_SENTENCES:
+        TextBlob(sentence).sentiment
+
+
+def _warm_deep():
+    from app.services.ml_model import load_bert_pipeline, run_pipeline_batches
+
+    pipe = load_bert_pipeline()
+    if not any(run_pipeline_batches(pipe, WARMUP_SENTENCES, len(WARMUP_SENTENCES))):
+        raise RuntimeError("Dummy batch produced no results")
+
+
+class EngineState:
+    __slots__ = ("state", "load_seconds", "error", "attempts")
+
+    def __init__(self, state: str):
+        self.state = state  # cold, loading, ready, failed, retrying or disabled
+        self.load_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self.attempts = 0
+
+    def to_dict(self) -> dict:
+        return {"state": self.state, "load_seconds": self.load_seconds, "error": self.error,
+                "attempts": self.attempts}
+
+
+class EngineWarmup:
+    """
+    Loads each engine once and runs a dummy batch through it, recording per-engine state
+    and load time. Engines that fail are retried with backoff. Safe to call from several
+    threads; engines already loaded or loading are skipped.
+    """
+
+    def __init__(self, loaders: Dict[str, Callable[[], None]], enabled: Dict[str, bool],
+                 retry_seconds: float = WARMUP_RETRY_SECONDS, max_attempts: int = WARMUP_MAX_ATTEMPTS):
+        self._loaders = loaders
+        self.retry_seconds = retry_seconds
+        self.max_attempts = max(1, max_attempts)
+        self._lock = threading.Lock()
+        self._engines = {
+            name: EngineState("cold" if enabled.get(name, True) else "disabled") for name in loaders
+        }
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def _warm(self, name: str):
+        with self._lock:
+            engine = self._engines[name]
+            if engine.state not in ("cold", "failed"):
+                return
+            engine.state = "loading" if engine.attempts == 0 else "retrying"
+            engine.attempts += 1
+        started = time.perf_counter()
+        try:
+            self._loaders[name]()
+        except Exception as e:
+            with self._lock:
+                engine.state = "failed"
+                engine.error = str(e)
+                engine.load_seconds = time.perf_counter() - started
+                attempts = engine.attempts
+            print(f"[WARN] Warm-up of {name} failed (attempt {attempts}/{self.max_attempts}): {e}")
+            return
+        with self._lock:
+            engine.state = "ready"
+            engine.error = None
+            engine.load_seconds = time.perf_counter() - started
+
+    def _retryable(self):
+        with self._lock:
+            return [name for name, e in self._engines.items()
+                    if e.state == "failed" and e.attempts < self.max_attempts]
+
+    def warm_up(self):
+        for name in self._loaders:
+            self._warm(name)
+        delay = self.retry_seconds
+        while not self._stopping.is_set():
+            failed = self._retryable()
+            if not failed or self._stopping.wait(delay):
+                return
+            for name in failed:
+                self._warm(name)
+            delay *= 2
+
+    def stop(self):
+        self._stopping.set()
+
+    def start(self):
+        """
+        Warm up in a daemon thread so the server starts accepting /health right away.
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self.warm_up, name="engine-warmup", daemon=True)
+        self._thread.start()
+
+    def is_ready(self, model: Optional[str] = None) -> bool:
+        """
+        With `model`, whether every engine that model needs is loaded. Without it, whether the
+        rule engines are loaded and every other engine has had its first try: an engine that
+        failed (the deep model, say) does not hold back traffic the rest can serve.
+        """
+        with self._lock:
+            if model is not None:
+                return all(self._engines[name].state in ("ready", "disabled") for name in MODEL_ENGINES[model])
+            return all(
+                e.state in ("ready", "disabled") if name in MODEL_ENGINES["rule"]
+                else e.state in ("ready", "disabled", "failed", "retrying")
+                for name, e in self._engines.items()
+            )
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            return {name: engine.to_dict() for name, engine in self._engines.items()}
+
+
+_warmup = None
+_warmup_lock = threading.Lock()
+
+def get_warmup() -> EngineWarmup:
+    """
+    Shared warm-up state. The deep engine only counts when ENABLE_DEEP_LEARNING is on.
+    """
+    global _warmup
+    if _warmup is None:
+        with _warmup_lock:
+            if _warmup is None:
+                from app.services.analysis import deep_learning_enabled
+
+                _warmup = EngineWarmup(
+                    {
+                        "langdetect": _warm_langdetect,
+                        "vader": _warm_vader,
+                        "textblob": _warm_textblob,
+                        "deep": _warm_deep,
+                    },
+                    {"deep": deep_learning_enabled()}
+                )
+    return _warmup
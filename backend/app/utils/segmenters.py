@@ -0,0 +1,97 @@
+# Sentence segmenters. Each returns (start, end) character spans into the paragraph, so a
+# sentence is paragraph[start:end] and results can be mapped back onto the original text.
+import os
+import re
+import threading
+from typing import Callable, List, Tuple
+
+from textblob import TextBlob
+
+Span = Tuple[int, int]
+
+# textblob - TextBlob(paragraph).sentences (reference; builds a Sentence object per sentence)
+# punkt    - the same Punkt model, cached and called directly for spans
+# rule     - regex splitter on terminal punctuation; no language data, fastest
+SEGMENTERS = ("textblob", "punkt", "rule")
+
+SENTENCE_SEGMENTER = os.getenv("SENTENCE_SEGMENTER", "textblob").lower()
+
+
+def textblob_spans(paragraph: str) -> List[Span]:
+    spans = []
+    cursor = 0
+    for sentence in TextBlob(paragraph).sentences:
+        # Locate each sentence after the previous one; TextBlob's own start_index can land on
+        # an earlier copy of a repeated sentence
+        text = str(sentence)
+        start = paragraph.index(text, cursor)
+        cursor = start + len(text)
+        spans.append((start, cursor))
+    return spans
+
+
+_punkt = None
+_punkt_lock = threading.Lock()
+
+def load_punkt():
+    """
+    The English Punkt model TextBlob uses, loaded once per process.
+    """
+    global _punkt
+    if _punkt is None:
+        with _punkt_lock:
+            if _punkt is None:
+                try:
+                    from nltk.tokenize import PunktTokenizer
+                    _punkt = PunktTokenizer("english")
+                except ImportError:
+                    import nltk
+                    _punkt = nltk.data.load("tokenizers/punkt/english.pickle")
+    return _punkt
+
+
+def punkt_spans(paragraph: str) -> List[Span]:
+    return list(load_punkt().span_tokenize(paragraph))
+
+
+# Terminal punctuation, closing quotes/brackets included, followed by whitespace
+_BOUNDARY = re.compile(r"[.!?]+[\"'”’)\]]*(?=\s)")
+_NON_SPACE = re.compile(r"\S")
+# A period after these (or after a single letter, as in initials) does not end the sentence
+_ABBREVIATIONS = frozenset({
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "vs", "etc", "e.g", "i.e", "cf",
+    "inc", "ltd", "co", "corp", "no", "fig", "approx", "dept", "est", "gen", "gov", "sen", "rep",
+    "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+})
+
+
+def rule_spans(paragraph: str) -> List[Span]:
+    first = _NON_SPACE.search(paragraph)
+    if first is None:
+        return []
+    spans = []
+    start = first.start()
+    for match in _BOUNDARY.finditer(paragraph, start):
+        following = _NON_SPACE.search(paragraph, match.end())
+        if following is None:
+            break
+        # Like Punkt, an ellipsis or a lowercase continuation does not end the sentence
+        if paragraph[following.start()].islower() or "..." in match.group():
+            continue
+        if paragraph[match.start()] == "." and paragraph[match.start() + 1:match.start() + 2] != ".":
+            words = paragraph[start:match.start()].rsplit(None, 1)
+            word = words[-1].lstrip("\"'“‘([").lower() if words else ""
+            if word in _ABBREVIATIONS or (len(word) == 1 and word.isalpha()):
+                continue
+        spans.append((start, match.end()))
+        start = following.start()
+    spans.append((start, len(paragraph.rstrip())))
+    return spans
+
+
+_SPAN_FUNCTIONS = {"textblob": textblob_spans, "punkt": punkt_spans, "rule": rule_spans}
+
+def get_segmenter(name: str = SENTENCE_SEGMENTER) -> Callable[[str], List[Span]]:
+    if name not in SEGMENTERS:
+        raise ValueError(f"Unknown SENTENCE_SEGMENTER '{name}'. Expected one of: {', '.join(SEGMENTERS)}")
+    return _SPAN_FUNCTIONS[name]
@@ -1,13 +1,71 @@
 # utils.py
 
-import nltk
-from nltk.tokenize import sent_tokenize
-from textblob import TextBlob
+from app.core.metrics import timed
+from app.utils.segmenters import get_segmenter
 
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+_segment = get_segmenter()
+
+class Sentence(str):
+    """
+    A sentence of a paragraph: the text itself and its character span in the paragraph.
+    """
+
+    def __new__(cls, text, start=None, end=None):
+        sentence = super().__new__(cls, text)
+        sentence.start = start
+        sentence.end = end
+        return sentence
 
 def split_into_sentences(paragraph: str):
-    return [str(s) for s in TextBlob(paragraph).sentences]
+    """
+    Split a paragraph with the SENTENCE_SEGMENTER segmenter. Each Sentence is
+    paragraph[sentence.start:sentence.end].
+    """
+    with timed("split"):
+        return [Sentence(paragraph[start:end], start, end) for start, end in _segment(paragraph)]
+
+class SentenceStream:
+    """
+    Incremental sentence segmentation for text that arrives in chunks. Every sentence but the
+    last one in the buffer is complete; the last is kept until more text (or the end) arrives.
+    """
+
+    def __init__(self, max_buffer_chars: int = 1 << 16):
+        self.max_buffer_chars = max_buffer_chars
+        self._buffer = ""
+        self._offset = 0  # position of the buffer in the whole text
+
+    def _split(self):
+        sentences = split_into_sentences(self._buffer)
+        # Spans relative to the whole text fed so far, not to the buffer
+        for sentence in sentences:
+            sentence.start += self._offset
+            sentence.end += self._offset
+        return sentences
+
+    def _consume(self, chars: int):
+        self._buffer = self._buffer[chars:]
+        self._offset += chars
+
+    def feed(self, text: str):
+        self._buffer += text
+        sentences = self._split()
+        # A boundary is only trusted once a word follows it, so trailing punctuation
+        # ("?" of a "??" still arriving) stays with the sentence held back
+        keep = 1
+        while keep < len(sentences) and not any(ch.isalnum() for ch in sentences[-keep]):
+            keep += 1
+        if len(sentences) <= keep:
+            if len(self._buffer) <= self.max_buffer_chars:
+                return []
+            # No boundary in sight; emit the run-on text rather than let the buffer grow
+            self._consume(len(self._buffer))
+            return sentences
+        # Keep the raw text of the (possibly unfinished) last sentences
+        self._consume(sentences[-keep].start - self._offset)
+        return sentences[:-keep]
+
+    def finish(self):
+        sentences = self._split() if self._buffer.strip() else []
+        self._consume(len(self._buffer))
+        return sentences
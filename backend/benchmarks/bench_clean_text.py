@@ -0,0 +1,79 @@
+# Microbenchmark: single-scan clean_text against the original four-pass implementation.
+# Usage (from backend/): python -m benchmarks.bench_clean_text
+import random
+import re
+import sys
+import time
+
+import emoji
+
+from app.services.sentiment_rule import clean_text, clean_texts
+
+
+def reference_clean_text(text):
+    # The original implementation, kept verbatim as the correctness oracle
+    text = emoji.demojize(text, delimiters=(" ", " "))
+    text = re.sub(r"http\S+|www\S+", "", text)
+    text = re.sub(r"[^\w\s.,!?]", "", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return text
+
+
+SAMPLES = [
+    "I love this product! 😍😍",
+    "Visit http://example.com/a?b=1 now!!",
+    "   spaced    out \t text \n ",
+    "w@ww.example hmm, www.site.org/path ok",
+    "ahttp://x.com, b and xhttp c",
+    "#hashtag @user check (this) out -- really?!",
+    "ok 👍🏽 thanks ©2024 ™ 1️⃣ #️⃣",
+    "Das ist ein sehr schönes Haus 🏠 und ich mag es.",
+    "ÇA VA?? 🙂 sure… “quoted” — dash",
+    "Thank you.",
+    "",
+]
+
+_ALPHABET = "abc XYZ 012 .,!?@#$%^&*()_-+=:;'\"\t\n/\\é漢字€" + "😀👍🏽❤️©™" + "http" + "www"
+
+
+def build_corpus(size=5000, seed=1234):
+    rng = random.Random(seed)
+    corpus = list(SAMPLES)
+    while len(corpus) < size:
+        length = rng.randint(0, 120)
+        corpus.append("".join(rng.choice(_ALPHABET) for _ in range(length)))
+    return corpus
+
+
+def time_per_call(func, corpus, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for text in corpus:
+            func(text)
+        best = min(best, time.perf_counter() - started)
+    return best / len(corpus)
+
+
+def main():
+    corpus = build_corpus()
+    mismatches = [t for t in corpus if clean_text(t) != reference_clean_text(t)]
+    if clean_texts(corpus) != [reference_clean_text(t) for t in corpus]:
+        mismatches.append("<clean_texts batch output differs>")
+    for text in mismatches[:10]:
+        print(f"MISMATCH {text!r}: {clean_text(text)!r} != {reference_clean_text(text)!r}")
+
+    plain = [t for t in build_corpus(seed=99) if t.isascii()] or SAMPLES
+    for name, texts in (("mixed", corpus), ("ascii", plain)):
+        old = time_per_call(reference_clean_text, texts)
+        new = time_per_call(clean_text, texts)
+        print(f"{name:>6}: reference {old * 1e6:8.2f} us/call | clean_text {new * 1e6:8.2f} us/call | speedup {old / new:5.2f}x")
+    started = time.perf_counter()
+    clean_texts(plain)
+    print(f" batch: clean_texts {(time.perf_counter() - started) / len(plain) * 1e6:8.2f} us/sentence")
+    print(f"identical output on {len(corpus)} texts: {not mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
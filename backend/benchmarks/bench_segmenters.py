@@ -0,0 +1,89 @@
+# Sentence segmenters against the TextBlob reference: speed and how often they agree.
+# Exits 1 if the punkt segmenter disagrees with TextBlob (it runs the same model) or a
+# segmenter returns spans that are out of order, overlap or end in whitespace.
+# Usage (from backend/): python -m benchmarks.bench_segmenters [--sentences 2000] [--per-paragraph 8]
+import argparse
+import random
+import sys
+import time
+
+from app.utils.segmenters import SEGMENTERS, get_segmenter, load_punkt
+from benchmarks.corpora import build_corpora, build_paragraphs
+
+# Cases the synthetic corpora do not cover
+EDGE_PARAGRAPHS = [
+    "Dr. Smith met Mr. Jones at 3 p.m. on Jan. 5. They talked.",
+    "It costs $3.50. That is cheap! Isn't it?",
+    "\"Stop!\" she said. \"Now.\" He stopped.",
+    "Wait... what? No way!!! OK.",
+    "e.g. this one. And i.e. that one.",
+    "Same. Same. Same.",
+    "   Leading and trailing space.   Second one.   ",
+    "No terminal punctuation at all",
+    "First line.\n\nSecond paragraph line.\nThird line without a stop",
+    "",
+    "   ",
+    "J. R. R. Tolkien wrote it. (Really.) Yes.",
+]
+
+
+def _check_spans(paragraph, spans):
+    previous_end = 0
+    for start, end in spans:
+        if not previous_end <= start < end <= len(paragraph) or paragraph[end - 1].isspace():
+            return False
+        previous_end = end
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare sentence segmenters with the TextBlob path")
+    parser.add_argument("--sentences", type=int, default=2000)
+    parser.add_argument("--per-paragraph", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args(argv)
+
+    corpora = build_corpora(args.sentences, args.seed)
+    paragraphs = {name: build_paragraphs(sentences, args.per_paragraph) for name, sentences in corpora.items()}
+    # Mix in newlines and repeated whitespace between sentences
+    rng = random.Random(args.seed)
+    paragraphs["mixed"] = [
+        "".join(s + rng.choice([" ", "  ", "\n", "\n\n"]) for s in rng.sample(corpora["short"], args.per_paragraph))
+        for _ in range(len(paragraphs["short"]))
+    ]
+    paragraphs["edge"] = EDGE_PARAGRAPHS
+    load_punkt()
+
+    reference = get_segmenter("textblob")
+    expected = {name: [reference(p) for p in texts] for name, texts in paragraphs.items()}
+    failed = False
+    for segmenter in SEGMENTERS:
+        split = get_segmenter(segmenter)
+        print(f"{segmenter}:")
+        for name, texts in paragraphs.items():
+            split(texts[0])
+            started = time.perf_counter()
+            actual = [split(p) for p in texts]
+            elapsed = time.perf_counter() - started
+            reference_spans = sum(len(spans) for spans in expected[name])
+            shared = sum(len(set(a) & set(e)) for a, e in zip(actual, expected[name]))
+            found = sum(len(spans) for spans in actual)
+            same_paragraphs = sum(1 for a, e in zip(actual, expected[name]) if a == e)
+            bad_spans = sum(1 for p, spans in zip(texts, actual) if not _check_spans(p, spans))
+            print(f"  {name:>12}: {len(texts) / elapsed:9.0f} paragraphs/s | identical paragraphs "
+                  f"{same_paragraphs / len(texts):6.1%} | sentence precision {shared / max(found, 1):6.1%}"
+                  f" recall {shared / max(reference_spans, 1):6.1%}")
+            if bad_spans:
+                print(f"    INVALID spans in {bad_spans} paragraphs")
+                failed = True
+            if segmenter == "punkt" and same_paragraphs != len(texts):
+                for p, a, e in zip(texts, actual, expected[name]):
+                    if a != e:
+                        print(f"    MISMATCH {p!r}: textblob {e} != punkt {a}")
+                        break
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
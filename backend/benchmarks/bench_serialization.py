@@ -0,0 +1,144 @@
+# Serialization cost of an /analyze response per 1k sentences: the pydantic path (a model per
+# sentence, re-validated against response_model, then encoded by FastAPI) against the plain-dict
+# path the endpoints use now. Then the size on the wire and gzip time of format=json against
+# format=columnar, with and without top_k. Exits 1 if two formats disagree on the content.
+# Usage (from backend/): python -m benchmarks.bench_serialization [--sentences 1000 5000] [--repeat 20]
+import argparse
+import asyncio
+import gzip
+import json
+import random
+import sys
+import time
+
+from fastapi.routing import serialize_response
+
+from app.core import serialization
+from app.models.sentiments import SentimentResponse
+from app.services.analysis import ParagraphAggregate, SentenceScore, build_columnar_response, build_response
+from app.utils.utils import Sentence
+from benchmarks.corpora import build_corpus
+
+LABELS = ["anger", "disgust", "fear", "joy", "neutral", "sadness", "surprise"]
+
+
+def build_scores(count: int, deep: bool, seed: int = 5):
+    rng = random.Random(seed)
+    scores = []
+    offset = 0
+    for text in build_corpus("emoji", count, seed):
+        sentence = Sentence(text, offset, offset + len(text))
+        offset += len(text) + 1
+        if deep:
+            weights = [rng.random() for _ in LABELS]
+            total = sum(weights)
+            distribution = {label: w / total for label, w in zip(LABELS, weights)}
+            label = max(distribution, key=distribution.get)
+            scores.append(SentenceScore(sentence, label.capitalize(), distribution[label], distribution[label],
+                                        distribution, emotion=label.capitalize()))
+        else:
+            score = rng.uniform(-1, 1)
+            sentiment = "Positive" if score >= 0.05 else "Negative" if score <= -0.05 else "Neutral"
+            scores.append(SentenceScore(sentence, sentiment, score, rng.choice([0.5, 1.0]), emotion=sentiment))
+    paragraph = " ".join(score.sentence for score in scores)
+    return paragraph, scores
+
+
+def pydantic_path(paragraph, scores, model, field):
+    aggregate = ParagraphAggregate(model)
+    for score in scores:
+        aggregate.add(score)
+    response = SentimentResponse(
+        results=[score.to_model() for score in scores],
+        paragraph_sentiment=aggregate.build(len(paragraph.split()), len(paragraph))
+    )
+    return asyncio.run(serialize_response(field=field, response_content=response, dump_json=True))
+
+
+def dict_path(paragraph, scores, model):
+    return serialization.dumps(build_response(paragraph, scores, model))
+
+
+def rounded_distributions(rows):
+    # format=json keeps full-precision distributions; columnar rounds them like scores
+    return [{**row, "distribution": row["distribution"] and {k: round(p, 2) for k, p in row["distribution"].items()}}
+            for row in rows]
+
+
+def columnar_rows(columnar):
+    # The format=json results rebuilt from a columnar response
+    labels = columnar["labels"]
+    distributions = columnar["distributions"]
+    rows = []
+    for i, sentence in enumerate(columnar["sentences"]):
+        distribution = None
+        if distributions is not None:
+            distribution = {labels[c]: p for c, p in zip(distributions["labels"][i], distributions["scores"][i])}
+        rows.append({
+            "sentence": sentence,
+            "sentiment": labels[columnar["sentiments"][i]],
+            "score": columnar["scores"][i],
+            "confidence": columnar["confidences"][i],
+            "distribution": distribution,
+            "start": columnar["starts"][i],
+            "end": columnar["ends"][i]
+        })
+    return rows
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time response serialization before and after the plain-dict path")
+    parser.add_argument("--sentences", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    from main import GZIP_COMPRESS_LEVEL, app
+    field = next(r for r in app.routes if getattr(r, "path", None) == "/analyze").response_field
+
+    encoder = "orjson" if serialization.orjson is not None else "json (orjson not installed)"
+    print(f"encoder: {encoder}")
+    mismatches = 0
+    for model in ("rule", "deep"):
+        for count in args.sentences:
+            paragraph, scores = build_scores(count, deep=model == "deep")
+            before = pydantic_path(paragraph, scores, model, field)
+            after = dict_path(paragraph, scores, model)
+            if json.loads(before) != json.loads(after):
+                print(f"MISMATCH for {model}/{count}")
+                mismatches += 1
+            slow = best_of(args.repeat, lambda: pydantic_path(paragraph, scores, model, field))
+            fast = best_of(args.repeat, lambda: dict_path(paragraph, scores, model))
+            per_k = 1000.0 / count
+            print(f"{model:>5} {count:>6} sentences: pydantic {slow * per_k * 1000:7.2f} ms/1k | "
+                  f"plain dict {fast * per_k * 1000:7.2f} ms/1k | speedup {slow / fast:5.2f}x | {len(after) / count:.0f} B/sentence")
+
+    # Bytes on the wire, compressed at the level GZipMiddleware uses
+    count = max(args.sentences)
+    print(f"\nwire size for {count} deep sentences (gzip level {GZIP_COMPRESS_LEVEL}):")
+    paragraph, scores = build_scores(count, deep=True)
+    for top_k in (None, 3, 1):
+        rows = build_response(paragraph, scores, "deep", top_k)
+        columnar = build_columnar_response(paragraph, scores, "deep", top_k)
+        if columnar_rows(columnar) != rounded_distributions(rows["results"]) or columnar["paragraph_sentiment"] != rows["paragraph_sentiment"]:
+            print(f"MISMATCH between json and columnar for top_k={top_k}")
+            mismatches += 1
+        for name, content in (("json", rows), ("columnar", columnar)):
+            body = serialization.dumps(content)
+            compress = best_of(max(1, args.repeat // 4), lambda: gzip.compress(body, compresslevel=GZIP_COMPRESS_LEVEL))
+            compressed = gzip.compress(body, compresslevel=GZIP_COMPRESS_LEVEL)
+            print(f"  {name:>8} top_k={str(top_k):>4}: {len(body) / 1024:8.1f} KiB | gzip {len(compressed) / 1024:7.1f} KiB"
+                  f" in {compress * 1000:6.2f} ms")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+# Startup report for rule-only workers: import time of the app, peak RSS, and whether the
+# deep-learning stack was pulled in. Exits 1 when the import budget is exceeded or torch /
+# transformers get imported with ENABLE_DEEP_LEARNING=false.
+# Usage (from backend/): python -m benchmarks.bench_startup [--budget 5.0] [--runs 3]
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+DEEP_MODULES = ("torch", "transformers", "onnxruntime", "optimum")
+
+_CHILD = """
+import json, resource, sys, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    "import_seconds": elapsed,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0,
+    "deep_modules": [m for m in %r if m in sys.modules],
+    "modules": len(sys.modules)
+}))
+""" % (DEEP_MODULES,)
+
+
+def measure_once(env):
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", _CHILD], capture_output=True, text=True, env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    wall = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing main failed:\n{completed.stderr}")
+    report = json.loads(completed.stdout.strip().splitlines()[-1])
+    report["process_seconds"] = wall
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure how fast a rule-only worker boots")
+    parser.add_argument("--budget", type=float, default=float(os.getenv("STARTUP_IMPORT_BUDGET_SECONDS", "5.0")),
+                        help="Maximum acceptable import time of main.py in seconds")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    env = {**os.environ, "ENABLE_DEEP_LEARNING": "false"}
+    runs = [measure_once(env) for _ in range(args.runs)]
+    best = min(runs, key=lambda r: r["import_seconds"])
+    deep_modules = sorted({m for r in runs for m in r["deep_modules"]})
+    print(f"import main:    {best['import_seconds']:.2f}s (best of {args.runs}, budget {args.budget:.2f}s)")
+    print(f"process total:  {best['process_seconds']:.2f}s")
+    print(f"peak RSS:       {best['max_rss_mb']:.0f} MB")
+    print(f"modules loaded: {best['modules']}")
+    print(f"deep stack:     {', '.join(deep_modules) if deep_modules else 'not imported'}")
+
+    failed = False
+    if best["import_seconds"] > args.budget:
+        print(f"FAIL: import took longer than the {args.budget:.2f}s budget")
+        failed = True
+    if deep_modules:
+        print("FAIL: rule-only startup imported the deep-learning stack")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+# Equivalence check and microbenchmark: the direct PatternAnalyzer path in sentiment_rule
+# against TextBlob(text).sentiment.polarity. Exits 1 if any polarity differs from the reference.
+# Usage (from backend/): python -m benchmarks.bench_textblob_batch [--fuzz 20000]
+import argparse
+import random
+import sys
+import time
+
+from textblob import TextBlob
+from textblob.en import sentiment as pattern_sentiment
+
+from app.services.sentiment_rule import PreparedSentence, textblob_scores
+from benchmarks.corpora import build_corpora
+
+
+def build_fuzz(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    pattern_sentiment.load()
+    lexicon = sorted(w for w in pattern_sentiment if w)
+    rule_words = ["not", "no", "never", "n't", "very", "really", "quite", "extremely", "too", "so",
+                  "don't", "isn't", "can't", "I'm", "it's", "won't", "more", "most", "less", "!"]
+    neutral = ["it", "was", "a", "movie", "and", "then", "we", "went", "home", "is", "I", "you"]
+    punctuation = ["", "", "", ",", ".", "!", "?", "!!", "...", ":)", ":(", ";-)", "(!)", "-", "'s"]
+    cases = []
+    for _ in range(count):
+        words = []
+        for _ in range(rng.randint(0, 18)):
+            roll = rng.random()
+            if roll < 0.45:
+                word = rng.choice(lexicon)
+            elif roll < 0.75:
+                word = rng.choice(rule_words)
+            else:
+                word = rng.choice(neutral)
+            if rng.random() < 0.15:
+                word = word.upper()
+            words.append(word + rng.choice(punctuation))
+        cases.append(rng.choice([" ", "  ", "\n"]).join(words))
+    return cases
+
+
+def _prepared(texts):
+    # Score exactly the given text, as the reference does, bypassing cleaning and language detection
+    return [PreparedSentence(t, t, t.split(), True) for t in texts]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the direct TextBlob polarity path and time it")
+    parser.add_argument("--fuzz", type=int, default=20000, help="Random lexicon-heavy sentences to check")
+    args = parser.parse_args(argv)
+
+    corpora = build_corpora(1000)
+    checks = {"fuzz": build_fuzz(args.fuzz), **corpora}
+    mismatches = 0
+    for name, texts in checks.items():
+        expected = [TextBlob(t).sentiment.polarity for t in texts]
+        actual = textblob_scores(_prepared(texts))
+        bad = [(t, e, a) for t, e, a in zip(texts, expected, actual) if e != a]
+        mismatches += len(bad)
+        print(f"{name:>12}: {len(texts) - len(bad)}/{len(texts)} identical")
+        for text, e, a in bad[:5]:
+            print(f"    MISMATCH {text!r}: reference {e} != direct {a}")
+
+    print()
+    for name, texts in corpora.items():
+        started = time.perf_counter()
+        for text in texts:
+            TextBlob(text).sentiment.polarity
+        reference = time.perf_counter() - started
+        started = time.perf_counter()
+        textblob_scores(_prepared(texts))
+        direct = time.perf_counter() - started
+        print(f"{name:>12}: TextBlob {len(texts) / reference:8.0f} sent/s | direct {len(texts) / direct:8.0f} sent/s"
+              f" ({reference / direct:4.2f}x)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+# Equivalence check and microbenchmark: BatchVader against SentimentIntensityAnalyzer.
+# Exits 1 if any compound score differs from the reference.
+# Usage (from backend/): python -m benchmarks.bench_vader_batch [--fuzz 20000]
+import argparse
+import random
+import sys
+import time
+
+from vaderSentiment.vaderSentiment import BOOSTER_DICT, NEGATE, SPECIAL_CASES, SentimentIntensityAnalyzer
+
+from app.services.vader_batch import BatchVader
+from benchmarks.corpora import build_corpora
+
+# Every rule of the reference, including the examples shipped with vaderSentiment
+RULE_CASES = [
+    "VADER is smart, handsome, and funny.",
+    "VADER is smart, handsome, and funny!",
+    "VADER is very smart, handsome, and funny.",
+    "VADER is VERY SMART, handsome, and FUNNY.",
+    "VADER is VERY SMART, handsome, and FUNNY!!!",
+    "VADER is VERY SMART, uber handsome, and FRIGGIN FUNNY!!!",
+    "VADER is not smart, handsome, nor funny.",
+    "The book was good.",
+    "At least it isn't a horrible book.",
+    "The book was only kind of good.",
+    "The plot was good, but the characters are uncompelling and the dialog is not great.",
+    "Today SUX!",
+    "Today only kinda sux! But I'll get by, lol",
+    "Make sure you :) or :D today!",
+    "Catch utf-8 emoji such as 💘 and 💋 and 😁",
+    "Not bad at all",
+    "Sentiment analysis has never been good.",
+    "Sentiment analysis has never been this good!",
+    "Most automated sentiment analysis tools are shit.",
+    "With VADER, sentiment analysis is the shit!",
+    "Other sentiment analysis tools can be quite bad.",
+    "On the other hand, VADER is quite bad ass",
+    "VADER is such a badass!",
+    "Without a doubt, excellent idea.",
+    "Roger Dodger is one of the most compelling variations on this theme.",
+    "Roger Dodger is at least compelling as a variation on the theme.",
+    "Roger Dodger is one of the least compelling variations on this theme.",
+    "Not such a badass after all.",
+    "Without a doubt, an excellent idea.",
+    "good good but good good bad bad",
+    "no good",
+    "no no good",
+    "not or nor good",
+    "no or great",
+    "kind of kind",
+    "least good",
+    "the least good",
+    "at least good",
+    "very least good",
+    "??? really?? !!!!!",
+    "",
+    "   ",
+    "?",
+    "GOOD",
+    "GOOD bad",
+]
+
+
+def build_fuzz(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    analyzer = SentimentIntensityAnalyzer()
+    lexicon = sorted(analyzer.lexicon)
+    rule_words = sorted(set(BOOSTER_DICT) | set(NEGATE) | {
+        "no", "or", "nor", "kind", "of", "never", "so", "this", "without", "doubt", "least", "at", "very",
+        "but", "BUT", "the", "shit", "bomb", "bad", "ass", "yeah", "right", "to", "die", "for", "kiss",
+        "death", "beating", "heart", "sort", "just", "enough", "isn't", "don't"
+    }) + [w for key in SPECIAL_CASES for w in key.split()]
+    neutral = ["it", "was", "a", "movie", "and", "then", "we", "went", "home", "is", "I", "you"]
+    emojis = [e for e in analyzer.emojis if len(e) == 1][:200]
+    punctuation = ["", "", "", ",", ".", "!", "?", "!!", "??", "...", ":)", ":(", "-"]
+    cases = []
+    for _ in range(count):
+        words = []
+        for _ in range(rng.randint(0, 18)):
+            roll = rng.random()
+            if roll < 0.35:
+                word = rng.choice(lexicon)
+            elif roll < 0.7:
+                word = rng.choice(rule_words)
+            elif roll < 0.95:
+                word = rng.choice(neutral)
+            else:
+                word = rng.choice(emojis)
+            if rng.random() < 0.15:
+                word = word.upper()
+            words.append(word + rng.choice(punctuation))
+        cases.append(" ".join(words))
+    return cases
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check BatchVader against the reference and time both")
+    parser.add_argument("--fuzz", type=int, default=20000, help="Random rule-heavy sentences to check")
+    args = parser.parse_args(argv)
+
+    reference = SentimentIntensityAnalyzer()
+    batch = BatchVader(reference)
+
+    corpora = build_corpora(1000)
+    checks = {"rules": RULE_CASES, "fuzz": build_fuzz(args.fuzz), **corpora}
+    mismatches = 0
+    for name, texts in checks.items():
+        expected = [reference.polarity_scores(t)["compound"] for t in texts]
+        actual = batch.compound_scores(texts)
+        bad = [(t, e, a) for t, e, a in zip(texts, expected, actual) if e != a]
+        mismatches += len(bad)
+        print(f"{name:>12}: {len(texts) - len(bad)}/{len(texts)} identical")
+        for text, e, a in bad[:5]:
+            print(f"    MISMATCH {text!r}: reference {e} != batch {a}")
+
+    print()
+    for name, texts in corpora.items():
+        started = time.perf_counter()
+        for text in texts:
+            reference.polarity_scores(text)
+        per_sentence = time.perf_counter() - started
+        started = time.perf_counter()
+        batch.compound_scores(texts)
+        batched = time.perf_counter() - started
+        print(f"{name:>12}: reference {len(texts) / per_sentence:9.0f} sent/s | batch {len(texts) / batched:9.0f} sent/s"
+              f" | speedup {per_sentence / batched:5.2f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+# Synthetic, seeded corpora for the benchmark suite. Everything is generated from the word
+# lists below, so a given (name, size, seed) always yields the same texts on every machine.
+import random
+from typing import Dict, List
+
+_SUBJECTS = ["I", "We", "My friend", "The team", "This product", "The movie", "Our trip", "The service",
+             "The new update", "Everyone here", "The food", "My manager", "The weather", "This book"]
+_VERBS = ["is", "was", "seems", "feels", "looked", "turned out", "has been", "became"]
+_ADJECTIVES = ["good", "great", "amazing", "wonderful", "fine", "okay", "bad", "terrible", "awful",
+               "boring", "disappointing", "fantastic", "slow", "friendly", "rude", "helpful", "confusing",
+               "beautiful", "horrible", "pleasant", "sad", "exciting", "annoying", "perfect"]
+_BOOSTERS = ["really", "very", "extremely", "kind of", "somewhat", "incredibly", "barely", "totally"]
+_NEGATIONS = ["not", "never", "hardly", "not at all", "no longer"]
+_CLAUSES = ["when we arrived", "after the first week", "even though the price was high",
+            "compared to last year", "for a Monday morning", "despite the long wait",
+            "as far as I can tell", "once the music started", "until the very end"]
+_CONNECTORS = ["but", "and", "although", "because", "yet", "so"]
+_ENDINGS = [".", "!", "?", "!!", "...", "."]
+
+_EMOJIS = ["😀", "😍", "😂", "😭", "😡", "👍", "👎", "🔥", "💔", "❤️", "🙏", "🎉", "😱", "🤔", "👍🏽", "✨"]
+
+_FOREIGN = {
+    "fr": ["Je suis très content de ce produit et je le recommande à tous mes amis",
+           "Le service était lent mais le personnel était très gentil avec nous",
+           "Nous avons passé une soirée magnifique dans ce petit restaurant",
+           "Ce film est vraiment ennuyeux et beaucoup trop long pour moi"],
+    "de": ["Das Essen war ausgezeichnet und die Bedienung sehr freundlich",
+           "Ich bin mit der neuen Version überhaupt nicht zufrieden",
+           "Wir haben uns sehr über das schöne Wetter gefreut",
+           "Der Zug hatte wieder eine Stunde Verspätung und niemand hat es erklärt"],
+    "es": ["La película fue increíble y los actores estuvieron perfectos",
+           "No me gustó nada el servicio del hotel durante las vacaciones",
+           "Mis amigos y yo pasamos un día maravilloso en la playa",
+           "El producto llegó roto y nadie respondió a mis mensajes"],
+    "it": ["Il viaggio è stato bellissimo e molto rilassante per tutta la famiglia",
+           "Questo libro è noioso e non lo consiglierei a nessuno"],
+    "pt": ["O atendimento foi excelente e a comida estava deliciosa",
+           "Eu não gostei do final do filme, foi muito confuso"],
+}
+
+
+def _phrase(rng: random.Random) -> str:
+    adjective = rng.choice(_ADJECTIVES)
+    roll = rng.random()
+    if roll < 0.25:
+        adjective = f"{rng.choice(_BOOSTERS)} {adjective}"
+    elif roll < 0.4:
+        adjective = f"{rng.choice(_NEGATIONS)} {adjective}"
+    return f"{rng.choice(_SUBJECTS)} {rng.choice(_VERBS)} {adjective}"
+
+
+def short_sentence(rng: random.Random) -> str:
+    return _phrase(rng) + rng.choice(_ENDINGS)
+
+
+def long_sentence(rng: random.Random) -> str:
+    parts = [_phrase(rng)]
+    for _ in range(rng.randint(2, 5)):
+        if rng.random() < 0.4:
+            parts.append(rng.choice(_CLAUSES))
+        parts.append(f"{rng.choice(_CONNECTORS)} {_phrase(rng).lower()}")
+    return ", ".join(parts) + rng.choice(_ENDINGS)
+
+
+def emoji_sentence(rng: random.Random) -> str:
+    words = short_sentence(rng).split()
+    for _ in range(rng.randint(2, 6)):
+        words.insert(rng.randint(0, len(words)), "".join(rng.choices(_EMOJIS, k=rng.randint(1, 3))))
+    return " ".join(words)
+
+
+def non_english_sentence(rng: random.Random) -> str:
+    sentences = _FOREIGN[rng.choice(sorted(_FOREIGN))]
+    first, second = rng.choice(sentences), rng.choice(sentences)
+    text = first if first == second else f"{first}, {second[0].lower()}{second[1:]}"
+    return text + rng.choice(_ENDINGS)
+
+
+GENERATORS = {
+    "short": short_sentence,
+    "long": long_sentence,
+    "emoji": emoji_sentence,
+    "non_english": non_english_sentence,
+}
+
+
+def build_corpus(name: str, size: int = 300, seed: int = 2024) -> List[str]:
+    """
+    `size` sentences of the given kind. Repeats are avoided where the generator allows it,
+    so per-sentence caches do not flatter the numbers.
+    """
+    rng = random.Random(f"{name}:{seed}")
+    generate = GENERATORS[name]
+    sentences, seen = [], set()
+    attempts = 0
+    while len(sentences) < size:
+        sentence = generate(rng)
+        attempts += 1
+        if sentence in seen and attempts < size * 20:
+            continue
+        seen.add(sentence)
+        sentences.append(sentence)
+    return sentences
+
+
+def build_corpora(size: int = 300, seed: int = 2024) -> Dict[str, List[str]]:
+    return {name: build_corpus(name, size, seed) for name in GENERATORS}
+
+
+def build_paragraphs(sentences: List[str], per_paragraph: int = 8) -> List[str]:
+    """
+    Group sentences into paragraphs for the splitting and end-to-end benchmarks.
+    """
+    return [" ".join(sentences[i:i + per_paragraph]) for i in range(0, len(sentences), per_paragraph)]
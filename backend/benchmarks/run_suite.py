@@ -0,0 +1,226 @@
+# Microbenchmark suite for the text-analysis hot paths.
+# Usage (from backend/):
+#   python -m benchmarks.run_suite                         # run everything, save JSON under benchmarks/results/
+#   python -m benchmarks.run_suite --sentences 100 --skip-deep
+#   python -m benchmarks.run_suite --compare benchmarks/results/<old>.json
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+# Repeated sentences would otherwise be served from the result cache
+os.environ["SENTENCE_CACHE_ENABLED"] = "false"
+
+from benchmarks.corpora import build_corpora, build_paragraphs
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+WARMUP_CALLS = 5
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(func, inputs, sentences_per_input=None):
+    """
+    Call `func` once per input, timing each call. Throughput is sentences per second,
+    where `sentences_per_input(input, output)` says how many sentences a call covered.
+    """
+    for item in inputs[:WARMUP_CALLS]:
+        func(item)
+    _reset_caches()
+    latencies = []
+    sentences = 0
+    for item in inputs:
+        started = time.perf_counter()
+        output = func(item)
+        latencies.append(time.perf_counter() - started)
+        sentences += sentences_per_input(item, output) if sentences_per_input else 1
+    total = sum(latencies)
+    latencies.sort()
+    return {
+        "calls": len(inputs),
+        "sentences": sentences,
+        "total_seconds": total,
+        "sentences_per_second": sentences / total if total else 0.0,
+        "latency_ms": {
+            "mean": statistics.fmean(latencies) * 1000.0 if latencies else 0.0,
+            "p50": percentile(latencies, 0.50) * 1000.0,
+            "p90": percentile(latencies, 0.90) * 1000.0,
+            "p99": percentile(latencies, 0.99) * 1000.0,
+            "max": latencies[-1] * 1000.0 if latencies else 0.0
+        }
+    }
+
+
+def analyze_endpoint(model):
+    """
+    The /analyze handler for one model, called as FastAPI would with the default format.
+    """
+    from app.models.sentiments import SentimentRequest
+    from main import analyze_sentiment_api
+
+    return lambda p: analyze_sentiment_api(SentimentRequest(paragraph=p), model=model, format="json", top_k=None)
+
+
+def response_sentences(_, response):
+    # The handler returns the encoded response; decoding it happens outside the timed call
+    return len(json.loads(response.body)["results"])
+
+
+def _reset_caches():
+    # Language verdicts are memoized; every benchmark starts cold so results do not depend on order
+    from app.services.language import _sample_is_english, detect_language
+
+    detect_language.cache_clear()
+    _sample_is_english.cache_clear()
+
+
+def rule_benchmarks(corpora, per_paragraph):
+    from app.services.sentiment_rule import (
+        clean_text,
+        ensemble_sentiment,
+        get_textblob_sentiment,
+        get_vader_sentiment,
+        is_english
+    )
+    from app.utils.utils import split_into_sentences
+
+    sentence_funcs = {
+        "clean_text": clean_text,
+        "is_english": is_english,
+        "get_vader_sentiment": get_vader_sentiment,
+        "get_textblob_sentiment": get_textblob_sentiment,
+        "ensemble_sentiment": ensemble_sentiment,
+    }
+    results = {}
+    for name, func in sentence_funcs.items():
+        for corpus, sentences in corpora.items():
+            results[f"{name}/{corpus}"] = measure(func, sentences)
+
+    for corpus, sentences in corpora.items():
+        paragraphs = build_paragraphs(sentences, per_paragraph)
+        results[f"split_into_sentences/{corpus}"] = measure(
+            split_into_sentences, paragraphs, lambda _, output: len(output)
+        )
+        results[f"analyze_sentiment_api[rule]/{corpus}"] = measure(
+            analyze_endpoint("rule"), paragraphs, response_sentences
+        )
+    return results
+
+
+def deep_benchmarks(corpora, per_paragraph):
+    try:
+        from benchmarks.tiny_model import install_tiny_pipeline
+        from app.services.ml_model import analyze_sentiment_bert
+        from app.services.inference_scheduler import get_scheduler
+
+        vocabulary = {word for sentences in corpora.values() for s in sentences for word in s.split()}
+        install_tiny_pipeline(vocabulary)
+    except ImportError as e:
+        print(f"[WARN] Skipping deep benchmarks: {e}")
+        return {}
+
+    previous = os.environ.get("ENABLE_DEEP_LEARNING")
+    os.environ["ENABLE_DEEP_LEARNING"] = "true"
+    results = {}
+    try:
+        for corpus, sentences in corpora.items():
+            results[f"analyze_sentiment_bert[tiny]/{corpus}"] = measure(analyze_sentiment_bert, sentences)
+            results[f"analyze_sentiment_api[deep,tiny]/{corpus}"] = measure(
+                analyze_endpoint("deep"), build_paragraphs(sentences, per_paragraph), response_sentences
+            )
+    finally:
+        if previous is None:
+            os.environ.pop("ENABLE_DEEP_LEARNING", None)
+        else:
+            os.environ["ENABLE_DEEP_LEARNING"] = previous
+        scheduler = get_scheduler()
+        if scheduler is not None:
+            scheduler.shutdown()
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(__file__)
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_results(results, baseline=None):
+    header = f"{'benchmark':<48} {'sent/s':>10} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9}"
+    if baseline:
+        header += f" {'vs base':>8}"
+    print(header)
+    for name, result in results.items():
+        latency = result["latency_ms"]
+        line = (f"{name:<48} {result['sentences_per_second']:>10.1f} {latency['p50']:>9.3f} "
+                f"{latency['p90']:>9.3f} {latency['p99']:>9.3f}")
+        if baseline:
+            old = baseline.get(name)
+            if old and old["sentences_per_second"]:
+                line += f" {result['sentences_per_second'] / old['sentences_per_second']:>7.2f}x"
+            else:
+                line += f" {'-':>8}"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the text-analysis hot paths")
+    parser.add_argument("--sentences", type=int, default=300, help="Sentences per corpus")
+    parser.add_argument("--per-paragraph", type=int, default=8, help="Sentences per paragraph for paragraph-level benchmarks")
+    parser.add_argument("--seed", type=int, default=2024)
+    parser.add_argument("--skip-deep", action="store_true", help="Only run the rule-based benchmarks")
+    parser.add_argument("--output", help="Where to write the JSON results (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare throughput against")
+    args = parser.parse_args(argv)
+
+    from app.services.language import init_language_detection
+
+    init_language_detection()
+    corpora = build_corpora(args.sentences, args.seed)
+    results = rule_benchmarks(corpora, args.per_paragraph)
+    if not args.skip_deep:
+        results.update(deep_benchmarks(corpora, args.per_paragraph))
+
+    commit = _git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {"sentences": args.sentences, "per_paragraph": args.per_paragraph, "seed": args.seed},
+        "results": results
+    }
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{commit}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+    print(f"\nSaved results to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+# A tiny, randomly initialized emotion classifier built locally, so the deep-model benchmarks
+# exercise the real tokenizer -> padded batch -> forward pass -> formatting path without
+# downloading the production checkpoint. Its scores are meaningless; only the timings matter.
+from typing import Iterable
+
+# Same label set as j-hartmann/emotion-english-distilroberta-base
+EMOTION_LABELS = ["anger", "disgust", "fear", "joy", "neutral", "sadness", "surprise"]
+_SPECIAL_TOKENS = ["<pad>", "<s>", "</s>", "<unk>"]
+
+
+def build_tiny_pipeline(vocabulary: Iterable[str] = (), hidden_size: int = 32, layers: int = 2,
+                        max_length: int = 128):
+    """
+    A text-classification pipeline with the production model's interface: a RoBERTa
+    sequence classifier over EMOTION_LABELS returning scores for every label.
+    """
+    import torch
+    from tokenizers import Tokenizer, models, pre_tokenizers, processors
+    from transformers import PreTrainedTokenizerFast, RobertaConfig, RobertaForSequenceClassification
+    from transformers.pipelines import pipeline
+
+    torch.manual_seed(0)
+    vocab = {token: i for i, token in enumerate(_SPECIAL_TOKENS)}
+    for word in sorted({w.lower() for w in vocabulary}):
+        vocab.setdefault(word, len(vocab))
+
+    tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="<unk>"))
+    tokenizer.normalizer = None
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="<s> $A </s>", special_tokens=[("<s>", vocab["<s>"]), ("</s>", vocab["</s>"])]
+    )
+    fast_tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer,
+        pad_token="<pad>",
+        unk_token="<unk>",
+        bos_token="<s>",
+        eos_token="</s>",
+        model_max_length=max_length
+    )
+    config = RobertaConfig(
+        vocab_size=len(vocab),
+        hidden_size=hidden_size,
+        num_hidden_layers=layers,
+        num_attention_heads=2,
+        intermediate_size=hidden_size * 2,
+        # RoBERTa offsets positions by the padding index
+        max_position_embeddings=max_length + 2,
+        pad_token_id=vocab["<pad>"],
+        num_labels=len(EMOTION_LABELS),
+        id2label=dict(enumerate(EMOTION_LABELS)),
+        label2id={label: i for i, label in enumerate(EMOTION_LABELS)}
+    )
+    model = RobertaForSequenceClassification(config).eval()
+    return pipeline("text-classification", model=model, tokenizer=fast_tokenizer, top_k=None)
+
+
+def install_tiny_pipeline(vocabulary: Iterable[str] = ()):
+    """
+    Make ml_model use the tiny pipeline instead of loading the production checkpoint.
+    """
+    from app.services import ml_model
+
+    ml_model._sentiment_pipeline = build_tiny_pipeline(vocabulary)
+    return ml_model._sentiment_pipeline
@@ -1,2 +1,26 @@
+# One-time provisioning of the language data used at runtime. The server never downloads
+# anything itself; it checks for this data at startup and refuses to start without it.
+# Usage: python download_nltk.py [target_dir]   (defaults to $NLTK_DATA or NLTK's user directory)
+import os
+import sys
+
 import nltk
-nltk.download('punkt')
\ No newline at end of file
+
+from app.core.corpora import REQUIRED_NLTK_RESOURCES, check_corpora
+
+target = sys.argv[1] if len(sys.argv) > 1 else os.getenv("NLTK_DATA")
+if target and target not in nltk.data.path:
+    nltk.data.path.insert(0, target)
+
+for resource in REQUIRED_NLTK_RESOURCES:
+    try:
+        nltk.data.find(resource)
+        continue
+    except LookupError:
+        pass
+    package = resource.split("/")[-1]
+    if not nltk.download(package, download_dir=target, quiet=True, raise_on_error=True):
+        sys.exit(f"Could not download {package}")
+
+check_corpora()
+print(f"Language data ready: {', '.join(REQUIRED_NLTK_RESOURCES)}")
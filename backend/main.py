@@ -1,39 +1,62 @@
 # main.py
 
 import os
-from fastapi import FastAPI, Query, Body
+import sys
+import json
+import time
+_BOOT_STARTED = time.perf_counter()
+import codecs
+import logging
+from dotenv import load_dotenv
+# Load .env before importing app modules, which read their settings at import time
+load_dotenv()
+# Per-sentence debug output is only produced with LOG_LEVEL=DEBUG
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
+logger = logging.getLogger("main")
+# Sets the OpenMP/BLAS thread budget, so it must come before anything imports torch or numpy
+from app.core.concurrency import admission, configure_request_threads
+from fastapi import FastAPI, Query, Body, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile
 from app.models.sentiments import (
     SentimentRequest,
     SentimentResponse,
-    SentenceSentiment,
-    ParagraphSentiment
+    ColumnarSentimentResponse,
+    BatchSentimentRequest,
+    BatchSentimentResponse,
+    DocumentSentimentResponse
 )
-from app.utils.utils import split_into_sentences
-from app.services.sentiment_rule import (
-    get_vader_sentiment,
-    get_textblob_sentiment,
-    classify_sentiment,
-    ensemble_sentiment,
-    clean_text,
-    is_english
+from app.services.analysis import (
+    RESPONSE_FORMATS,
+    DocumentAnalyzer,
+    ParagraphAggregate,
+    analyze_paragraph,
+    analyze_paragraphs,
+    deep_learning_enabled,
+    iter_sentence_scores,
+    model_version,
+    unavailable_response
 )
-from app.services.ml_model import analyze_sentiment_bert
-from dotenv import load_dotenv
-load_dotenv()
-import os
+from app.services.inference_scheduler import get_scheduler
+from app.services.language import init_language_detection
+from app.services.rule_pool import shutdown_rule_pool
+from app.services.sentence_cache import close_sentence_cache, get_sentence_cache
+from app.services.warmup import WARMUP_ON_STARTUP, get_warmup
+from app.services.insights import etag_matches, get_insights_buffer, get_insights_cache
+from app.core.corpora import check_corpora
+from app.core.serialization import FastJSONResponse, dumps
+from app.core.metrics import MetricsMiddleware, gauge_lines, mark_handler_done, record_analysis, render_metrics, timed
 print("ENABLE_DEEP_LEARNING:", os.environ.get("ENABLE_DEEP_LEARNING"))
-from collections import Counter
-import nltk
-import textblob.download_corpora
 import asyncpg
 import asyncio
 from fastapi import APIRouter
 from app.soulsync import SoulSyncAgent
 from fastapi import Request
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Union
 
 # In-memory session store for demo (replace with persistent store for production)
 soulsync_sessions = {}
@@ -50,26 +73,6 @@ class SoulSyncChatResponse(BaseModel):
 # Create a global connection pool
 pool = None
 
-def ensure_nltk_textblob_corpora():
-    # Download punkt for NLTK
-    try:
-        nltk.data.find('tokenizers/punkt')
-    except LookupError:
-        nltk.download('punkt')
-    # Download punkt_tab for NLTK (rare, but some TextBlob versions require it)
-    try:
-        nltk.data.find('tokenizers/punkt_tab')
-    except LookupError:
-        nltk.download('punkt_tab')
-    # Download TextBlob corpora (wordnet, brown, etc.)
-    try:
-        textblob.download_corpora.download_all()
-    except Exception as e:
-        print(f"[WARN] Could not download TextBlob corpora: {e}")
-
-# Ensure corpora are present before app starts
-ensure_nltk_textblob_corpora()
-
 app = FastAPI()
 
 # CORS config for frontend (move this to be the very first middleware)
@@ -85,16 +88,52 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add GZip compression for all responses
-app.add_middleware(GZipMiddleware, minimum_size=500)
+# Add GZip compression for all responses. zlib's default level: level 9 (Starlette's default)
+# is several times slower on large responses for a few percent smaller bodies
+GZIP_COMPRESS_LEVEL = int(os.getenv("GZIP_COMPRESS_LEVEL", "6"))
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=GZIP_COMPRESS_LEVEL)
+
+# Outermost, so the Server-Timing total covers every other middleware
+app.add_middleware(MetricsMiddleware)
 
 @app.on_event("startup")
 async def startup():
     global pool
+    # Language data is provisioned ahead of time (download_nltk.py); never fetched on boot
+    check_corpora()
+    await configure_request_threads()
     pool = await asyncpg.create_pool(DATABASE_URL, min_size=1, max_size=5)
+    get_insights_buffer().start(pool)
+    init_language_detection()
+    cache = get_sentence_cache()
+    if cache is not None:
+        # Drop results produced by older model versions
+        removed = cache.purge_stale({m: model_version(m) for m in ("rule", "deep")})
+        if removed:
+            print(f"[INFO] Purged {removed} stale sentence cache entries")
+    if WARMUP_ON_STARTUP:
+        # Engines load in the background; /ready reports when they are done
+        get_warmup().start()
+    # Without warm-up, the deep-learning stack is imported on the first deep request
+    logger.info("Startup finished in %.2fs (deep learning %s, transformers %s)",
+                time.perf_counter() - _BOOT_STARTED,
+                "enabled" if deep_learning_enabled() else "disabled",
+                "loaded" if "transformers" in sys.modules else "not loaded")
 
 @app.on_event("shutdown")
 async def shutdown():
+    get_warmup().stop()
+    scheduler = get_scheduler()
+    if scheduler is not None:
+        scheduler.shutdown()
+    shutdown_rule_pool()
+    # Commits results still queued for the disk tier
+    await run_in_threadpool(close_sentence_cache)
+    # Write out buffered insights increments before the pool goes away
+    try:
+        await get_insights_buffer().stop()
+    except Exception as e:
+        print(f"[ERROR] Could not flush insights counters on shutdown: {e}")
     await pool.close()
 
 @app.get("/")
@@ -105,10 +144,93 @@ def root():
 def health_check():
     return {"status": "ok"}
 
+@app.get("/ready")
+def readiness_check(model: Optional[str] = Query(None, enum=["rule", "deep"])):
+    """
+    Readiness for load balancers: 503 until the rule engines have been loaded and have scored
+    a dummy batch, and the deep model (when enabled) has had its first try. With `model`, 503
+    until that model's engines are loaded. /health only says the process is up.
+    """
+    warmup = get_warmup()
+    ready = warmup.is_ready(model) or not WARMUP_ON_STARTUP
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "warmup": WARMUP_ON_STARTUP, "engines": warmup.stats()}
+    )
+
 @app.get("/version")
 def version():
     return {"version": "1.0.0", "model": "VADER + TextBlob"}
 
+@app.get("/scheduler/stats")
+def scheduler_stats():
+    scheduler = get_scheduler()
+    if scheduler is None:
+        return {"enabled": False}
+    return {"enabled": True, **scheduler.stats()}
+
+@app.get("/admission/stats")
+def admission_stats():
+    return admission.stats()
+
+@app.get("/cache/stats")
+def sentence_cache_stats():
+    cache = get_sentence_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus text exposition: per-stage latency histograms, sentences per request,
+    model choice, plus the admission, scheduler and cache counters.
+    """
+    extra = []
+    admission_stats = admission.stats()
+    extra += gauge_lines("admission_in_flight", "Requests currently running analysis",
+                         {(("model", m),): s["in_flight"] for m, s in admission_stats.items()})
+    extra += gauge_lines("admission_rejected_total", "Requests turned away with 503",
+                         {(("model", m),): s["rejected"] for m, s in admission_stats.items()}, "counter")
+    scheduler = get_scheduler()
+    if scheduler is not None:
+        stats = scheduler.stats()
+        extra += gauge_lines("inference_queue_depth", "Sentences waiting for the deep model", {(): stats["queue_depth"]})
+        extra += gauge_lines("inference_batches_total", "Micro-batches run by the deep model", {(): stats["batches"]}, "counter")
+    cache = get_sentence_cache()
+    if cache is not None:
+        stats = cache.stats()
+        extra += gauge_lines("sentence_cache_lookups_total", "Sentence cache lookups by outcome", {
+            (("result", "memory_hit"),): stats["memory_hits"],
+            (("result", "disk_hit"),): stats["disk_hits"],
+            (("result", "miss"),): stats["misses"]
+        }, "counter")
+        extra += gauge_lines("sentence_cache_pending_writes", "Results queued for the sentence cache disk tier",
+                             {(): stats["pending_writes"]})
+        extra += gauge_lines("sentence_cache_dropped_writes_total", "Results not written to disk because the queue was full",
+                             {(): stats["dropped_writes"]}, "counter")
+    insights_cache = get_insights_cache().stats()
+    extra += gauge_lines("insights_cache_requests_total", "/insights requests by how they were served", {
+        (("result", "fresh"),): insights_cache["hits"],
+        (("result", "stale"),): insights_cache["stale_hits"],
+        (("result", "refresh"),): insights_cache["refreshes"]
+    }, "counter")
+    insights = get_insights_buffer().stats()
+    extra += gauge_lines("insights_pending_analyses", "Insights increments buffered but not yet written",
+                         {(): insights["pending_analyses"]})
+    extra += gauge_lines("insights_flushes_total", "Writes of buffered insights increments by outcome", {
+        (("result", "ok"),): insights["flushes"],
+        (("result", "failed"),): insights["failures"]
+    }, "counter")
+    return PlainTextResponse(render_metrics(extra), media_type="text/plain; version=0.0.4")
+
+@app.post("/cache/invalidate")
+def sentence_cache_invalidate(model: Optional[str] = Query(None, enum=["rule", "deep"])):
+    cache = get_sentence_cache()
+    if cache is None:
+        return {"enabled": False, "removed": 0}
+    return {"enabled": True, "removed": cache.invalidate(model)}
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 # Log the database URL (partially, for debugging)
@@ -119,135 +241,193 @@ else:
     print("[ERROR] DATABASE_URL is not set!")
 
 async def increment_global_insights(num_emotions: int):
+    # Buffered and written by the insights flusher; only waits on the database when the
+    # buffer is full or write-behind is off
     try:
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                UPDATE global_insights
-                SET total_analyses = total_analyses + 1,
-                    total_emotions = total_emotions + $1
-            """, num_emotions)
+        await get_insights_buffer().add(num_emotions)
     except Exception as e:
         print(f"[ERROR] Could not connect to database: {e}")
         raise
 
-@app.post("/analyze", response_model=SentimentResponse)
-def analyze_sentiment_api(request: SentimentRequest, model: str = Query("rule", enum=["rule", "deep"])) -> SentimentResponse:
-    enable_deep = os.getenv("ENABLE_DEEP_LEARNING", "false").lower() == "true"
+@app.post("/analyze", response_model=Union[SentimentResponse, ColumnarSentimentResponse])
+def analyze_sentiment_api(
+    request: SentimentRequest,
+    model: str = Query("rule", enum=["rule", "deep"]),
+    format: str = Query("json", enum=list(RESPONSE_FORMATS)),
+    top_k: Optional[int] = Query(None, ge=1, description="Keep only the k most likely labels of each distribution")
+) -> Union[SentimentResponse, ColumnarSentimentResponse]:
+    """
+    `format=columnar` returns parallel arrays instead of one object per sentence, with
+    labels sent once in a label table; much smaller for long deep-mode documents.
+    """
     try:
-        sentences = split_into_sentences(request.paragraph)
-        sentence_results: list[SentenceSentiment] = []
-        total_score = 0.0
-        total_confidence = 0.0
-        emotion_counts = {}
-        all_emotions = []
-
-        for sentence in sentences:
-            if model == "deep":
-                if not enable_deep:
-                    sentiment = "Unavailable"
-                    avg_score = 0.0
-                    confidence = 0.0
-                    distribution = None
-                else:
-                    # Use deep learning emotion model
-                    bert_result = analyze_sentiment_bert(sentence)
-                    if bert_result is None:
-                        sentiment = "Unavailable"
-                        avg_score = 0.0
-                        confidence = 0.0
-                        distribution = None
-                    else:
-                        sentiment = bert_result["emotion"].capitalize()
-                        avg_score = bert_result["score"]
-                        confidence = bert_result["score"]
-                        distribution = bert_result.get("distribution")
-                        # Count emotions for summary
-                        emotion_counts[sentiment] = emotion_counts.get(sentiment, 0) + 1
-                        all_emotions.append(sentiment)
-            else:
-                # Use rule-based model
-                cleaned = clean_text(sentence)
-                print(f"[DEBUG] Original: {sentence} | Cleaned: {cleaned}")
-                english = is_english(cleaned)
-                print(f"[DEBUG] is_english: {english}")
-                if not cleaned or not english:
-                    sentiment = "Neutral"
-                    avg_score = 0.0
-                    confidence = 0.0
-                    distribution = None
-                else:
-                    avg_score, confidence = ensemble_sentiment(cleaned)
-                    print(f"[DEBUG] Score: {avg_score}, Confidence: {confidence}")
-                    sentiment = classify_sentiment(avg_score)
-                    print(f"[DEBUG] Classified: {sentiment}")
-                    distribution = None
-                    all_emotions.append(sentiment)
-            total_score += avg_score
-            total_confidence += confidence
-
-            sentence_results.append(SentenceSentiment(
-                sentence=sentence,
-                sentiment=sentiment,
-                score=round(avg_score, 2),
-                confidence=round(confidence, 2),
-                distribution=distribution
-            ))
-
-        avg_paragraph_score = round(total_score / len(sentence_results), 2) if sentence_results else 0.0
-        avg_paragraph_confidence = round(total_confidence / len(sentence_results), 2) if sentence_results else 0.0
-        if model == "deep" and emotion_counts:
-            # Pick the most frequent emotion for the paragraph
-            paragraph_sentiment = max(emotion_counts, key=lambda k: emotion_counts[k])
-        else:
-            paragraph_sentiment = classify_sentiment(avg_paragraph_score)
-
-        # --- New fields ---
-        paragraph_text = request.paragraph
-        word_count = len(paragraph_text.split())
-        char_count = len(paragraph_text)
-        # Mental state: most common emotion/sentiment
-        if all_emotions:
-            mental_state = Counter(all_emotions).most_common(1)[0][0]
-            total = len(all_emotions)
-            mental_state_distribution = {k: v / total for k, v in Counter(all_emotions).items()}
-        else:
-            mental_state = None
-            mental_state_distribution = None
-
         # Do NOT increment global insights here
-        return SentimentResponse(
-            results=sentence_results,
-            paragraph_sentiment=ParagraphSentiment(
-                sentiment=paragraph_sentiment,
-                average_score=avg_paragraph_score,
-                confidence=avg_paragraph_confidence,
-                word_count=word_count,
-                char_count=char_count,
-                mental_state=mental_state,
-                mental_state_distribution=mental_state_distribution
-            )
-        )
-
+        with admission.admit(model):
+            response = analyze_paragraph(request.paragraph, model, format, top_k)
+        record_analysis("analyze", model, len(response["sentences" if format == "columnar" else "results"]))
+        mark_handler_done()
+        # Built as plain dicts and encoded once; response_model only documents the schema
+        return FastJSONResponse(response)
     except ImportError as e:
-        return SentimentResponse(
-            results=[],
-            paragraph_sentiment=ParagraphSentiment(
-                sentiment="Unavailable",
-                average_score=0.0,
-                confidence=0.0
-            )
-        )
+        return unavailable_response(format)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ ERROR in /analyze: {e}")
         raise e
 
+MAX_BATCH_DOCUMENTS = int(os.getenv("MAX_BATCH_DOCUMENTS", "1000"))
+
+@app.post("/analyze/batch", response_model=BatchSentimentResponse)
+def analyze_batch_api(request: BatchSentimentRequest, model: str = Query("rule", enum=["rule", "deep"])) -> BatchSentimentResponse:
+    if len(request.paragraphs) > MAX_BATCH_DOCUMENTS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_DOCUMENTS} documents per batch")
+    try:
+        with admission.admit(model):
+            results = analyze_paragraphs(request.paragraphs, model)
+        record_analysis("batch", model, sum(len(r["results"]) for r in results))
+        mark_handler_done()
+        return FastJSONResponse({"results": results})
+    except ImportError as e:
+        return BatchSentimentResponse(results=[unavailable_response() for _ in request.paragraphs])
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ ERROR in /analyze/batch: {e}")
+        raise e
+
+def _stream_event(event: str, payload: str, fmt: str) -> str:
+    if fmt == "sse":
+        return f"event: {event}\ndata: {payload}\n\n"
+    return f'{{"type": "{event}", "data": {payload}}}\n'
+
+@app.post("/analyze/stream")
+def analyze_stream_api(
+    request: SentimentRequest,
+    model: str = Query("rule", enum=["rule", "deep"]),
+    format: str = Query("ndjson", enum=["ndjson", "sse"])
+):
+    """
+    Streaming variant of /analyze: one `sentence` event per SentenceSentiment as soon as it
+    is scored, then a final `summary` event carrying the ParagraphSentiment.
+    """
+    paragraph = request.paragraph
+
+    def events():
+        # The slot is held until the stream has been fully produced
+        admission.try_acquire(model)
+        aggregate = ParagraphAggregate(model)
+        try:
+            yield ""
+            for score in iter_sentence_scores(paragraph, model):
+                aggregate.add(score)
+                yield _stream_event("sentence", dumps(score.to_dict()).decode("utf-8"), format)
+            summary = aggregate.build(len(paragraph.split()), len(paragraph))
+        except ImportError as e:
+            summary = unavailable_response().paragraph_sentiment
+        except Exception as e:
+            print(f"❌ ERROR in /analyze/stream: {e}")
+            yield _stream_event("error", json.dumps({"detail": str(e)}), format)
+            return
+        finally:
+            admission.release(model)
+        record_analysis("stream", model, aggregate.count)
+        yield _stream_event("summary", summary.model_dump_json(), format)
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    # An explicit Content-Encoding keeps GZipMiddleware from buffering events until its
+    # compressor fills up, and X-Accel-Buffering does the same for nginx-style proxies
+    headers = {"Cache-Control": "no-cache", "Content-Encoding": "identity", "X-Accel-Buffering": "no"}
+    # Run the generator up to its first yield here, so a model at capacity is still a 503. From
+    # then on the slot is released by the generator's `finally`, which also runs when the stream
+    # is closed or garbage collected without ever being sent.
+    stream = events()
+    next(stream)
+    try:
+        return StreamingResponse(stream, media_type=media_type, headers=headers)
+    except BaseException:
+        stream.close()
+        raise
+
+MAX_DOCUMENT_BYTES = int(os.getenv("MAX_DOCUMENT_BYTES", str(20 * 1024 * 1024)))
+# Bytes of upload gathered before each segmentation/scoring step
+DOCUMENT_CHUNK_BYTES = 64 * 1024
+
+async def _document_chunks(request: Request):
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        # The form parser spools the upload to a temporary file, so it is read back in chunks
+        if request.headers.get("content-length") is None:
+            raise HTTPException(status_code=411, detail="Multipart uploads need a Content-Length header")
+        form = await request.form()
+        upload = form.get("file")
+        if not isinstance(upload, UploadFile):
+            raise HTTPException(status_code=400, detail="Expected a 'file' field in the multipart form")
+        while True:
+            chunk = await upload.read(DOCUMENT_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+        return
+    pending = b""
+    async for chunk in request.stream():
+        pending += chunk
+        if len(pending) >= DOCUMENT_CHUNK_BYTES:
+            yield pending
+            pending = b""
+    if pending:
+        yield pending
+
+@app.post(
+    "/analyze/document",
+    response_model=DocumentSentimentResponse,
+    openapi_extra={"requestBody": {"required": True, "content": {
+        "text/plain": {"schema": {"type": "string"}},
+        "multipart/form-data": {"schema": {"type": "object", "properties": {"file": {"type": "string", "format": "binary"}}}}
+    }}}
+)
+async def analyze_document_api(request: Request, model: str = Query("rule", enum=["rule", "deep"])):
+    """
+    Large-document mode: the plain-text or multipart body is segmented incrementally and
+    scored chunk by chunk. Only the paragraph summary is returned.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length is not None and content_length.isdigit() and int(content_length) > MAX_DOCUMENT_BYTES:
+        raise HTTPException(status_code=413, detail=f"Documents are limited to {MAX_DOCUMENT_BYTES} bytes")
+
+    # The whole body is received and size-checked before taking an analysis slot, so slow
+    # uploads do not hold a slot while they transfer
+    chunks = []
+    received = 0
+    async for chunk in _document_chunks(request):
+        received += len(chunk)
+        if received > MAX_DOCUMENT_BYTES:
+            raise HTTPException(status_code=413, detail=f"Documents are limited to {MAX_DOCUMENT_BYTES} bytes")
+        chunks.append(chunk)
+
+    await run_in_threadpool(admission.try_acquire, model)
+    try:
+        analyzer = DocumentAnalyzer(model)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        for chunk in chunks:
+            await run_in_threadpool(analyzer.feed, decoder.decode(chunk))
+        await run_in_threadpool(analyzer.feed, decoder.decode(b"", final=True))
+        response = await run_in_threadpool(analyzer.finish)
+        record_analysis("document", model, response.sentence_count)
+        mark_handler_done()
+        return response
+    except ImportError as e:
+        return DocumentSentimentResponse(paragraph_sentiment=unavailable_response().paragraph_sentiment, sentence_count=0)
+    finally:
+        admission.release(model)
+
 # Add a new endpoint to increment global insights
 @app.post("/increment-insights")
 async def increment_insights(num_emotions: int = Body(..., embed=True)):
-    print(f"[DEBUG] /increment-insights called with num_emotions={num_emotions}")
+    logger.debug("/increment-insights called with num_emotions=%s", num_emotions)
     try:
         await increment_global_insights(num_emotions)
-        print("[DEBUG] increment_global_insights succeeded")
+        logger.debug("increment_global_insights succeeded")
         return {"status": "ok"}
     except Exception as e:
         print(f"[ERROR] increment_global_insights failed: {e}")
@@ -255,7 +435,7 @@ async def increment_insights(num_emotions: int = Body(..., embed=True)):
 
 @app.post("/soulsync/chat", response_model=SoulSyncChatResponse)
 def soulsync_chat(request: SoulSyncChatRequest):
-    print("Received:", request)
+    logger.debug("Received: %s", request)
     # Use session_id if provided, else create new
     import uuid
     session_id = request.session_id or str(uuid.uuid4())
@@ -270,29 +450,23 @@ def soulsync_chat(request: SoulSyncChatRequest):
     return SoulSyncChatResponse(response=response, session_id=session_id, should_continue=should_continue)
 
 @app.get("/insights")
-async def get_insights():
+async def get_insights(request: Request):
+    """
+    Served from the insights cache. Clients that send back the ETag get a 304 while the
+    numbers have not changed.
+    """
+    payload, etag = await get_insights_cache().get(_load_insights)
+    # no-cache: browsers may keep the body but must revalidate it on every poll
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(payload, headers=headers)
+
+async def _load_insights():
+    with timed("db"):
+        return await _read_insights()
+
+async def _read_insights():
     async with pool.acquire() as conn:
-        # Get global counts
-        row = await conn.fetchrow("SELECT total_analyses, total_emotions FROM global_insights LIMIT 1")
-        total_analyses = row["total_analyses"] if row else 0
-        total_emotions = row["total_emotions"] if row else 0
-
-        # Calculate average confidence (all-time)
-        avg_conf_row = await conn.fetchrow("SELECT AVG((summary->>'confidence')::float) AS avg_confidence FROM analysis_history WHERE summary->>'confidence' IS NOT NULL")
-        avg_confidence = avg_conf_row["avg_confidence"] if avg_conf_row else None
-
-        # Count all-time unique users
-        sessions_row = await conn.fetchrow("SELECT COUNT(DISTINCT user_id) AS sessions FROM analysis_history")
-        sessions = sessions_row["sessions"] if sessions_row else 0
-
-        # Sentiment distribution (all-time, by paragraph_sentiment)
-        sentiment_rows = await conn.fetch("SELECT summary->>'sentiment' AS sentiment, COUNT(*) AS count FROM analysis_history WHERE summary->>'sentiment' IS NOT NULL GROUP BY sentiment")
-        sentiment_distribution = {row["sentiment"]: row["count"] for row in sentiment_rows}
-
-        return {
-            "total_analyses": total_analyses,
-            "total_emotions": total_emotions,
-            "avg_confidence": avg_confidence,
-            "sessions": sessions,
-            "sentiment_distribution": sentiment_distribution
-        }
+        # One query over the trigger-maintained rollups, not scans of analysis_history
+        return await get_insights_buffer().read_insights(conn)
@@ -0,0 +1,25 @@
+import pytest
+
+from app.services import analysis
+from app.services.sentence_cache import SentenceCache
+
+# Decided by the document's language: long enough to need detection, no stop words either way
+SHARED = "Bonjour Marie, wonderful trip indeed."
+ENGLISH = "I had such a lovely time on this holiday with all of my friends and my family. " + SHARED
+FRENCH = "Je suis allé au marché avec ma mère et nous avons acheté des légumes pour le dîner. " + SHARED
+
+
+def _shared_sentiments(responses):
+    return [response["results"][-1]["sentiment"] for response in responses]
+
+
+@pytest.mark.parametrize("documents", [[ENGLISH, FRENCH], [FRENCH, ENGLISH]])
+def test_batch_keeps_paragraph_verdicts_per_document(monkeypatch, documents):
+    monkeypatch.setattr(analysis, "get_sentence_cache", lambda: None)
+    expected = _shared_sentiments(analysis.analyze_paragraphs(documents, "rule"))
+    assert len(set(expected)) == 2
+
+    monkeypatch.setattr(analysis, "get_sentence_cache", lambda cache=SentenceCache(100): cache)
+    assert _shared_sentiments(analysis.analyze_paragraphs(documents, "rule")) == expected
+    # Nothing paragraph-dependent was stored, so a second pass gives the same answer
+    assert _shared_sentiments(analysis.analyze_paragraphs(documents, "rule")) == expected
@@ -0,0 +1,33 @@
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from app.services import inference_backends
+from app.services.ml_model import run_pipeline_batches
+from benchmarks.tiny_model import EMOTION_LABELS, build_tiny_pipeline
+
+
+@pytest.fixture
+def tiny_checkpoint(monkeypatch):
+    # build_pipeline loads the tiny model in place of the production checkpoint
+    import transformers
+
+    tiny = build_tiny_pipeline(["happy", "sad", "day"])
+    monkeypatch.setattr(transformers.AutoTokenizer, "from_pretrained", lambda *a, **kw: tiny.tokenizer)
+    monkeypatch.setattr(transformers.AutoModelForSequenceClassification, "from_pretrained", lambda *a, **kw: tiny.model)
+
+
+def test_build_pipeline_returns_every_label(tiny_checkpoint):
+    pipe = inference_backends.build_pipeline("torch")
+    results = run_pipeline_batches(pipe, ["happy day", "sad", "a happy sad day"], batch_size=2)
+
+    for result in results:
+        assert set(result["distribution"]) == set(EMOTION_LABELS)
+        assert sum(result["distribution"].values()) == pytest.approx(1.0, abs=1e-4)
+        assert result["score"] == max(result["distribution"].values())
+
+
+def test_build_pipeline_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        inference_backends.build_pipeline("tensorrt")
@@ -0,0 +1,33 @@
+import asyncio
+import contextlib
+
+import pytest
+
+from app.services.insights import InsightsBuffer
+
+
+class FailingConn:
+    async def execute(self, *args):
+        raise ConnectionError("database is gone")
+
+
+class FailingPool:
+    @contextlib.asynccontextmanager
+    async def acquire(self):
+        yield FailingConn()
+
+
+def test_stop_raises_when_the_final_flush_fails(capsys):
+    async def run():
+        buffer = InsightsBuffer(flush_interval_ms=60_000, flush_threshold=100)
+        buffer.start(FailingPool())
+        await buffer.add(3)
+        await buffer.add(2)
+        with pytest.raises(ConnectionError):
+            await buffer.stop()
+        return buffer
+
+    buffer = asyncio.run(run())
+
+    assert "Dropping 2 analyses and 5 emotions" in capsys.readouterr().out
+    assert buffer.stats()["failures"] >= 1
@@ -0,0 +1,15 @@
+import pytest
+
+from app.services.ml_model import _format_emotions
+
+
+def test_format_emotions_keeps_the_full_distribution():
+    result = _format_emotions([{"label": "joy", "score": 0.7}, {"label": "anger", "score": 0.3}])
+
+    assert result == {"emotion": "joy", "score": 0.7, "distribution": {"joy": 0.7, "anger": 0.3}}
+
+
+def test_format_emotions_rejects_a_bare_top_label():
+    # What a pipeline built without top_k=None returns for each input
+    with pytest.raises(ValueError):
+        _format_emotions({"label": "joy", "score": 0.7})
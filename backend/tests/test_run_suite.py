@@ -0,0 +1,16 @@
+import json
+
+from benchmarks import run_suite
+
+
+def test_rule_suite_runs_on_a_tiny_corpus(tmp_path):
+    output = tmp_path / "results.json"
+
+    assert run_suite.main(["--sentences", "8", "--per-paragraph", "4", "--skip-deep", "--output", str(output)]) == 0
+
+    results = json.loads(output.read_text(encoding="utf-8"))["results"]
+    endpoint = {name: r for name, r in results.items() if name.startswith("analyze_sentiment_api[rule]/")}
+    assert endpoint
+    for result in endpoint.values():
+        assert result["calls"] == 2
+        assert result["sentences"] > 0
@@ -0,0 +1,60 @@
+import threading
+
+from app.services.sentence_cache import SentenceCache
+
+VALUE = {"sentiment": "Positive", "score": 0.5, "confidence": 1.0, "distribution": None, "emotion": "Positive"}
+
+
+def test_disk_writes_happen_off_the_calling_thread(tmp_path, monkeypatch):
+    cache = SentenceCache(10, str(tmp_path / "cache.sqlite3"))
+    writers = []
+    write = cache._write
+    monkeypatch.setattr(cache, "_write", lambda batch: writers.append(threading.current_thread().name) or write(batch))
+
+    cache.put_many(["A fine day."], [VALUE], "rule", "v1")
+    cache.flush()
+
+    assert writers and threading.current_thread().name not in writers
+    cache.close()
+
+
+def test_queued_writes_survive_close(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SentenceCache(10, path)
+    cache.put_many([f"Sentence {i}." for i in range(50)], [VALUE] * 50, "rule", "v1")
+    cache.close()
+
+    reopened = SentenceCache(10, path)
+    assert reopened.get_many(["Sentence 0.", "Sentence 49."], "rule", "v1") == [VALUE, VALUE]
+    assert reopened.stats()["disk_hits"] == 2
+    reopened.close()
+
+
+def test_close_closes_every_connection(tmp_path):
+    cache = SentenceCache(10, str(tmp_path / "cache.sqlite3"))
+    reader = threading.Thread(target=cache.get_many, args=(["Anything."], "rule", "v1"))
+    reader.start()
+    reader.join()
+    cache.put_many(["A fine day."], [VALUE], "rule", "v1")
+    connections = list(cache._connections)
+    assert len(connections) >= 2
+
+    cache.close()
+
+    assert cache._connections == []
+    for conn in connections:
+        try:
+            conn.execute("SELECT 1")
+        except Exception as e:
+            assert "closed" in str(e)
+        else:
+            raise AssertionError("connection still open")
+
+
+def test_invalidate_waits_for_queued_writes(tmp_path):
+    cache = SentenceCache(10, str(tmp_path / "cache.sqlite3"))
+    cache.put_many(["A fine day."], [VALUE], "rule", "v1")
+
+    assert cache.invalidate("rule") == 1
+    assert cache.get_many(["A fine day."], "rule", "v1") == [None]
+    cache.close()
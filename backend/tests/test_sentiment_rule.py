@@ -0,0 +1,48 @@
+import pytest
+from textblob import TextBlob
+
+from app.services import sentiment_rule
+from app.services.sentiment_rule import ensemble_prepared, prepare_sentence, textblob_score, textblob_scores
+
+SENTENCES = [
+    "I really loved this wonderful little cafe!",
+    "The service was not good and the coffee was terrible.",
+    "It is what it is.",
+]
+
+
+@pytest.fixture
+def tokenizer_calls(monkeypatch):
+    calls = []
+    tokenize = sentiment_rule.pattern_sentiment.tokenizer
+
+    def counting(text, *args, **kwargs):
+        calls.append(text)
+        return tokenize(text, *args, **kwargs)
+
+    monkeypatch.setattr(sentiment_rule.pattern_sentiment, "tokenizer", counting)
+    return calls
+
+
+def test_each_sentence_is_tokenized_once(tokenizer_calls):
+    prepared = [prepare_sentence(s) for s in SENTENCES]
+    assert len(tokenizer_calls) == len(SENTENCES)
+
+    textblob_scores(prepared)
+    for p in prepared:
+        textblob_score(p)
+        ensemble_prepared(p)
+    assert len(tokenizer_calls) == len(SENTENCES)
+
+
+def test_polarity_matches_textblob():
+    for sentence in SENTENCES:
+        prepared = prepare_sentence(sentence)
+        assert textblob_score(prepared) == TextBlob(prepared.cleaned).sentiment.polarity
+
+
+def test_non_english_sentences_are_not_tokenized(tokenizer_calls):
+    prepared = prepare_sentence("Je suis allé au marché avec ma mère ce matin pour acheter des légumes.")
+    assert not prepared.english
+    assert prepared.tokens is None
+    assert tokenizer_calls == []
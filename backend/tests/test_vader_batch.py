@@ -0,0 +1,51 @@
+import pytest
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from app.services import sentiment_rule
+from app.services.sentiment_rule import PreparedSentence, VADER_BATCH_MIN_SENTENCES, vader_scores
+from app.services.vader_batch import BatchVader
+from benchmarks.bench_vader_batch import RULE_CASES, build_fuzz
+
+REFERENCE = SentimentIntensityAnalyzer()
+FUZZ = build_fuzz(3000, seed=11)
+
+
+def _expected(texts):
+    return [REFERENCE.polarity_scores(t)["compound"] for t in texts]
+
+
+@pytest.mark.parametrize("texts", [RULE_CASES, FUZZ], ids=["rules", "fuzz"])
+def test_batch_matches_reference(texts):
+    assert BatchVader(REFERENCE).compound_scores(texts) == _expected(texts)
+
+
+@pytest.mark.parametrize("text", RULE_CASES)
+def test_single_sentence_batches_match_reference(text):
+    assert BatchVader(REFERENCE).compound_scores([text]) == _expected([text])
+
+
+@pytest.mark.parametrize("size", [1, VADER_BATCH_MIN_SENTENCES - 1, VADER_BATCH_MIN_SENTENCES, 200])
+def test_vader_scores_match_reference_around_batch_threshold(size):
+    texts = [t for t in RULE_CASES + FUZZ if t.strip()][:size]
+    prepared = [PreparedSentence(t, t, t.split(), True) for t in texts]
+    # A non-English sentence in the middle keeps its None without shifting the others
+    middle = len(prepared) // 2
+    prepared.insert(middle, PreparedSentence("x", "x", ["x"], False))
+
+    scores = vader_scores(prepared)
+
+    assert scores[middle] is None
+    assert [s for p, s in zip(prepared, scores) if p.english] == _expected(texts)
+
+
+def test_vader_scores_uses_the_batch_path_above_threshold(monkeypatch):
+    calls = []
+    compound_scores = sentiment_rule.batch_vader.compound_scores
+    monkeypatch.setattr(sentiment_rule.batch_vader, "compound_scores",
+                        lambda texts: calls.append(len(texts)) or compound_scores(texts))
+    texts = [t for t in FUZZ if t.strip()]
+
+    vader_scores([PreparedSentence(t, t, t.split(), True) for t in texts[:VADER_BATCH_MIN_SENTENCES - 1]])
+    assert calls == []
+    vader_scores([PreparedSentence(t, t, t.split(), True) for t in texts[:VADER_BATCH_MIN_SENTENCES]])
+    assert calls == [VADER_BATCH_MIN_SENTENCES]
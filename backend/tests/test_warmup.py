@@ -0,0 +1,50 @@
+from app.services.warmup import EngineWarmup
+
+
+def _loaders(deep):
+    noop = lambda: None
+    return {"langdetect": noop, "vader": noop, "textblob": noop, "deep": deep}
+
+
+def test_failed_deep_warmup_does_not_block_rule_readiness():
+    def broken():
+        raise RuntimeError("no weights")
+
+    warmup = EngineWarmup(_loaders(broken), {"deep": True}, retry_seconds=0, max_attempts=3)
+    warmup.warm_up()
+
+    assert warmup.is_ready()
+    assert warmup.is_ready("rule")
+    assert not warmup.is_ready("deep")
+    deep = warmup.stats()["deep"]
+    assert deep["state"] == "failed"
+    assert deep["attempts"] == 3
+
+
+def test_failed_engine_is_retried_until_it_loads():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise RuntimeError("download interrupted")
+
+    warmup = EngineWarmup(_loaders(flaky), {"deep": True}, retry_seconds=0, max_attempts=5)
+    warmup.warm_up()
+
+    assert warmup.is_ready("deep")
+    assert warmup.stats()["deep"] == {"state": "ready", "load_seconds": warmup.stats()["deep"]["load_seconds"],
+                                      "error": None, "attempts": 2}
+
+
+def test_rule_engines_gate_readiness():
+    def broken():
+        raise RuntimeError("missing lexicon")
+
+    loaders = _loaders(lambda: None)
+    loaders["vader"] = broken
+    warmup = EngineWarmup(loaders, {"deep": False}, retry_seconds=0, max_attempts=1)
+    warmup.warm_up()
+
+    assert not warmup.is_ready()
+    assert warmup.is_ready("deep")
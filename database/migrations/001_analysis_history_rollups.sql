@@ -0,0 +1,140 @@
+-- Typed sentiment/confidence columns and trigger-maintained rollups for /insights.
+-- For databases created from an older schema.sql; new databases get all of this from schema.sql.
+-- Safe to re-run. Adding the generated columns rewrites analysis_history once.
+--   psql <your-db-connection-string> -f database/migrations/001_analysis_history_rollups.sql
+
+BEGIN;
+
+-- No analyses may be written between the backfill and the trigger taking over
+LOCK TABLE analysis_history IN SHARE ROW EXCLUSIVE MODE;
+
+-- Typed copies of the summary fields the insights read
+ALTER TABLE analysis_history
+    ADD COLUMN IF NOT EXISTS sentiment TEXT
+        GENERATED ALWAYS AS (summary->>'sentiment') STORED,
+    ADD COLUMN IF NOT EXISTS confidence DOUBLE PRECISION
+        GENERATED ALWAYS AS (
+            CASE
+                WHEN jsonb_typeof(summary->'confidence') = 'number'
+                    THEN (summary->>'confidence')::double precision
+                WHEN summary->>'confidence' ~ '^\s*[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][-+]?[0-9]+)?\s*$'
+                    THEN (summary->>'confidence')::double precision
+            END
+        ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_analysis_history_sentiment ON analysis_history(sentiment);
+
+-- The rollups only hold derived data, rebuilt by the backfill below
+DROP TRIGGER IF EXISTS analysis_history_rollup ON analysis_history;
+DROP TRIGGER IF EXISTS analysis_history_rollup_update ON analysis_history;
+DROP TABLE IF EXISTS analysis_insights_rollup, analysis_sentiment_counts;
+
+-- Everything /insights reports about analysis_history besides sentiment counts, as partial
+-- sums spread over up to 16 shard rows so concurrent writers do not contend on one row.
+-- Readers add the shards up.
+CREATE TABLE analysis_insights_rollup (
+    shard INTEGER PRIMARY KEY,
+    distinct_users BIGINT NOT NULL DEFAULT 0,
+    confidence_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    confidence_count BIGINT NOT NULL DEFAULT 0
+);
+
+-- Analyses per sentiment label, sharded the same way
+CREATE TABLE analysis_sentiment_counts (
+    sentiment TEXT NOT NULL,
+    shard INTEGER NOT NULL,
+    row_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (sentiment, shard)
+);
+
+-- Analyses per user, so distinct_users stays exact when analyses are deleted
+CREATE TABLE IF NOT EXISTS analysis_user_counts (
+    user_id UUID PRIMARY KEY,
+    row_count BIGINT NOT NULL DEFAULT 0
+);
+
+-- Sharded insights counters (INSIGHTS_COUNTER_SHARDS)
+CREATE TABLE IF NOT EXISTS global_insights_shards (
+    shard INTEGER PRIMARY KEY,
+    total_analyses BIGINT NOT NULL DEFAULT 0,
+    total_emotions BIGINT NOT NULL DEFAULT 0
+);
+
+-- Add (delta = 1) or remove (delta = -1) one analysis from the rollups. SECURITY DEFINER so
+-- the trigger can maintain them for users that RLS keeps out of these tables.
+CREATE OR REPLACE FUNCTION analysis_rollup_apply(p_user_id UUID, p_sentiment TEXT,
+                                                 p_confidence DOUBLE PRECISION, p_delta INTEGER)
+RETURNS VOID AS $$
+DECLARE
+    user_rows BIGINT;
+    user_delta INTEGER := 0;
+    -- Concurrent sessions add to different rollup rows instead of queueing on one
+    rollup_shard INTEGER := pg_backend_pid() % 16;
+BEGIN
+    IF p_user_id IS NOT NULL THEN
+        INSERT INTO analysis_user_counts (user_id, row_count) VALUES (p_user_id, p_delta)
+        ON CONFLICT (user_id) DO UPDATE SET row_count = analysis_user_counts.row_count + p_delta
+        RETURNING row_count INTO user_rows;
+        IF p_delta > 0 AND user_rows = 1 THEN
+            user_delta := 1;
+        ELSIF p_delta < 0 AND user_rows = 0 THEN
+            user_delta := -1;
+            DELETE FROM analysis_user_counts WHERE user_id = p_user_id;
+        END IF;
+    END IF;
+    IF p_sentiment IS NOT NULL THEN
+        INSERT INTO analysis_sentiment_counts (sentiment, shard, row_count) VALUES (p_sentiment, rollup_shard, p_delta)
+        ON CONFLICT (sentiment, shard) DO UPDATE SET row_count = analysis_sentiment_counts.row_count + p_delta;
+    END IF;
+    IF user_delta <> 0 OR p_confidence IS NOT NULL THEN
+        INSERT INTO analysis_insights_rollup (shard, distinct_users, confidence_sum, confidence_count)
+        VALUES (rollup_shard, user_delta, COALESCE(p_confidence * p_delta, 0),
+                CASE WHEN p_confidence IS NULL THEN 0 ELSE p_delta END)
+        ON CONFLICT (shard) DO UPDATE
+        SET distinct_users = analysis_insights_rollup.distinct_users + EXCLUDED.distinct_users,
+            confidence_sum = analysis_insights_rollup.confidence_sum + EXCLUDED.confidence_sum,
+            confidence_count = analysis_insights_rollup.confidence_count + EXCLUDED.confidence_count;
+    END IF;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE OR REPLACE FUNCTION analysis_history_rollup()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM analysis_rollup_apply(OLD.user_id, OLD.sentiment, OLD.confidence, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM analysis_rollup_apply(NEW.user_id, NEW.sentiment, NEW.confidence, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill from the rows already there
+TRUNCATE analysis_user_counts;
+
+INSERT INTO analysis_sentiment_counts (sentiment, shard, row_count)
+SELECT sentiment, 0, COUNT(*) FROM analysis_history WHERE sentiment IS NOT NULL GROUP BY sentiment;
+
+INSERT INTO analysis_user_counts (user_id, row_count)
+SELECT user_id, COUNT(*) FROM analysis_history WHERE user_id IS NOT NULL GROUP BY user_id;
+
+INSERT INTO analysis_insights_rollup (shard, distinct_users, confidence_sum, confidence_count)
+SELECT 0, COUNT(DISTINCT user_id), COALESCE(SUM(confidence), 0), COUNT(confidence) FROM analysis_history;
+
+CREATE TRIGGER analysis_history_rollup AFTER INSERT OR DELETE ON analysis_history
+    FOR EACH ROW EXECUTE FUNCTION analysis_history_rollup();
+-- Edits only touch the rollups when they change a counted value
+CREATE TRIGGER analysis_history_rollup_update AFTER UPDATE OF user_id, summary ON analysis_history
+    FOR EACH ROW
+    WHEN (OLD.user_id IS DISTINCT FROM NEW.user_id
+          OR OLD.sentiment IS DISTINCT FROM NEW.sentiment
+          OR OLD.confidence IS DISTINCT FROM NEW.confidence)
+    EXECUTE FUNCTION analysis_history_rollup();
+
+ALTER TABLE analysis_insights_rollup ENABLE ROW LEVEL SECURITY;
+ALTER TABLE analysis_sentiment_counts ENABLE ROW LEVEL SECURITY;
+ALTER TABLE analysis_user_counts ENABLE ROW LEVEL SECURITY;
+
+COMMIT;
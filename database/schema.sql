@@ -18,6 +18,16 @@ CREATE TABLE analysis_history (
     model VARCHAR(50) NOT NULL,
     results JSONB,
     summary JSONB,
+    -- Typed copies of the summary fields the insights read
+    sentiment TEXT GENERATED ALWAYS AS (summary->>'sentiment') STORED,
+    confidence DOUBLE PRECISION GENERATED ALWAYS AS (
+        CASE
+            WHEN jsonb_typeof(summary->'confidence') = 'number'
+                THEN (summary->>'confidence')::double precision
+            WHEN summary->>'confidence' ~ '^\s*[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][-+]?[0-9]+)?\s*$'
+                THEN (summary->>'confidence')::double precision
+        END
+    ) STORED,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
@@ -33,14 +43,52 @@ INSERT INTO global_insights (total_analyses, total_emotions)
 SELECT 0, 0
 WHERE NOT EXISTS (SELECT 1 FROM global_insights);
 
+-- Sharded counters, used instead of the singleton row when INSIGHTS_COUNTER_SHARDS > 0.
+-- Totals are the singleton row plus the sum of all shards.
+CREATE TABLE IF NOT EXISTS global_insights_shards (
+    shard INTEGER PRIMARY KEY,
+    total_analyses BIGINT NOT NULL DEFAULT 0,
+    total_emotions BIGINT NOT NULL DEFAULT 0
+);
+
+-- Rollups of analysis_history, kept current by the analysis_history_rollup trigger below,
+-- so /insights reads a few rows instead of scanning every analysis.
+-- Everything /insights reports about analysis_history besides sentiment counts, as partial
+-- sums spread over up to 16 shard rows so concurrent writers do not contend on one row.
+-- Readers add the shards up.
+CREATE TABLE IF NOT EXISTS analysis_insights_rollup (
+    shard INTEGER PRIMARY KEY,
+    distinct_users BIGINT NOT NULL DEFAULT 0,
+    confidence_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    confidence_count BIGINT NOT NULL DEFAULT 0
+);
+
+-- Analyses per sentiment label, sharded the same way
+CREATE TABLE IF NOT EXISTS analysis_sentiment_counts (
+    sentiment TEXT NOT NULL,
+    shard INTEGER NOT NULL,
+    row_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (sentiment, shard)
+);
+
+-- Analyses per user, so distinct_users stays exact when analyses are deleted
+CREATE TABLE IF NOT EXISTS analysis_user_counts (
+    user_id UUID PRIMARY KEY,
+    row_count BIGINT NOT NULL DEFAULT 0
+);
+
 -- Create indexes for better performance
 CREATE INDEX idx_users_email ON users(email);
 CREATE INDEX idx_analysis_history_user_id ON analysis_history(user_id);
 CREATE INDEX idx_analysis_history_created_at ON analysis_history(created_at DESC);
+CREATE INDEX idx_analysis_history_sentiment ON analysis_history(sentiment);
 
 -- Enable Row Level Security (RLS)
 ALTER TABLE users ENABLE ROW LEVEL SECURITY;
 ALTER TABLE analysis_history ENABLE ROW LEVEL SECURITY;
+ALTER TABLE analysis_insights_rollup ENABLE ROW LEVEL SECURITY;
+ALTER TABLE analysis_sentiment_counts ENABLE ROW LEVEL SECURITY;
+ALTER TABLE analysis_user_counts ENABLE ROW LEVEL SECURITY;
 
 -- Create RLS policies
 CREATE POLICY "Users can view own profile" ON users
@@ -69,4 +117,66 @@ $$ language 'plpgsql';
 
 -- Create trigger for updated_at
 CREATE TRIGGER update_users_updated_at BEFORE UPDATE ON users
-    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column(); 
\ No newline at end of file
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Add (delta = 1) or remove (delta = -1) one analysis from the rollups. SECURITY DEFINER so
+-- the trigger can maintain them for users that RLS keeps out of these tables.
+CREATE OR REPLACE FUNCTION analysis_rollup_apply(p_user_id UUID, p_sentiment TEXT,
+                                                 p_confidence DOUBLE PRECISION, p_delta INTEGER)
+RETURNS VOID AS $$
+DECLARE
+    user_rows BIGINT;
+    user_delta INTEGER := 0;
+    -- Concurrent sessions add to different rollup rows instead of queueing on one
+    rollup_shard INTEGER := pg_backend_pid() % 16;
+BEGIN
+    IF p_user_id IS NOT NULL THEN
+        INSERT INTO analysis_user_counts (user_id, row_count) VALUES (p_user_id, p_delta)
+        ON CONFLICT (user_id) DO UPDATE SET row_count = analysis_user_counts.row_count + p_delta
+        RETURNING row_count INTO user_rows;
+        IF p_delta > 0 AND user_rows = 1 THEN
+            user_delta := 1;
+        ELSIF p_delta < 0 AND user_rows = 0 THEN
+            user_delta := -1;
+            DELETE FROM analysis_user_counts WHERE user_id = p_user_id;
+        END IF;
+    END IF;
+    IF p_sentiment IS NOT NULL THEN
+        INSERT INTO analysis_sentiment_counts (sentiment, shard, row_count) VALUES (p_sentiment, rollup_shard, p_delta)
+        ON CONFLICT (sentiment, shard) DO UPDATE SET row_count = analysis_sentiment_counts.row_count + p_delta;
+    END IF;
+    IF user_delta <> 0 OR p_confidence IS NOT NULL THEN
+        INSERT INTO analysis_insights_rollup (shard, distinct_users, confidence_sum, confidence_count)
+        VALUES (rollup_shard, user_delta, COALESCE(p_confidence * p_delta, 0),
+                CASE WHEN p_confidence IS NULL THEN 0 ELSE p_delta END)
+        ON CONFLICT (shard) DO UPDATE
+        SET distinct_users = analysis_insights_rollup.distinct_users + EXCLUDED.distinct_users,
+            confidence_sum = analysis_insights_rollup.confidence_sum + EXCLUDED.confidence_sum,
+            confidence_count = analysis_insights_rollup.confidence_count + EXCLUDED.confidence_count;
+    END IF;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE OR REPLACE FUNCTION analysis_history_rollup()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM analysis_rollup_apply(OLD.user_id, OLD.sentiment, OLD.confidence, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM analysis_rollup_apply(NEW.user_id, NEW.sentiment, NEW.confidence, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Keep the rollups current as analyses are added, edited and deleted
+CREATE TRIGGER analysis_history_rollup AFTER INSERT OR DELETE ON analysis_history
+    FOR EACH ROW EXECUTE FUNCTION analysis_history_rollup();
+-- Edits only touch the rollups when they change a counted value
+CREATE TRIGGER analysis_history_rollup_update AFTER UPDATE OF user_id, summary ON analysis_history
+    FOR EACH ROW
+    WHEN (OLD.user_id IS DISTINCT FROM NEW.user_id
+          OR OLD.sentiment IS DISTINCT FROM NEW.sentiment
+          OR OLD.confidence IS DISTINCT FROM NEW.confidence)
+    EXECUTE FUNCTION analysis_history_rollup();